@@ -4,29 +4,205 @@ Advanced Member Journey Visualization Dashboard
 Comprehensive Streamlit app with episode tracking, persona analysis, and decision traceability
 """
 
+from __future__ import annotations
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import json
+import orjson
 import glob
-from datetime import datetime, timedelta
+import hashlib
+import io
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, TYPE_CHECKING
 import uuid
 
+# pandas is imported inside the views that need it; the welcome screen never loads it
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Import our analysis components
 from journey_analyzer import JourneyAnalyzer, Episode, PersonaState, InternalMetrics
 from decision_visualizer import DecisionVisualizer
 from state import ConversationalState
 
+# -------- Cached resources ----------
+@st.cache_resource
+def _get_analyzer() -> JourneyAnalyzer:
+    """Shared JourneyAnalyzer instance, reused across reruns"""
+    return JourneyAnalyzer()
+
+@st.cache_resource
+def _get_visualizer() -> DecisionVisualizer:
+    """Shared DecisionVisualizer instance, reused across reruns"""
+    return DecisionVisualizer()
+
+# -------- Cached data loading ----------
+@st.cache_data(show_spinner=False)
+def _load_journey(files_with_mtime: tuple) -> Dict[str, Any]:
+    """Analyze checkpoint files; cached on (path, mtime) so unchanged files are not re-parsed"""
+    return JourneyAnalyzer().analyze_journey([file_path for file_path, _ in files_with_mtime])
+
+@st.cache_data(show_spinner=False)
+def _load_uploaded_journey(upload_key: tuple, _contents: tuple) -> Dict[str, Any]:
+    """Analyze uploaded checkpoint files in memory; cached on (name, sha1) of each upload"""
+    return JourneyAnalyzer().analyze_journey([io.BytesIO(content) for content in _contents])
+
+def _read_decisions(file_path: str) -> List[Dict[str, Any]]:
+    """Read all active and completed decision chains from one checkpoint file"""
+    with open(file_path, 'rb') as f:
+        state = orjson.loads(f.read())['state']
+    return list(chain(state.get('active_decision_chains', []), state.get('completed_decision_chains', [])))
+
+@st.cache_data(show_spinner=False)
+def _load_decision_chains(files_with_mtime: tuple) -> List[Dict[str, Any]]:
+    """Load decision chains from all checkpoint files in parallel"""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        file_paths = [file_path for file_path, _ in files_with_mtime]
+        return list(chain.from_iterable(executor.map(_read_decisions, file_paths)))
+
+@st.cache_data(show_spinner=False)
+def _cached_decision_tree(decision_key: tuple, _decision: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the decision tree visualization; cached on (decision_id, updated_at)"""
+    return _get_visualizer().create_decision_tree(_decision)
+
+def _journey_hash(journey_data: Dict[str, Any]) -> str:
+    """Stable content hash of journey data, used as a cache key instead of hashing the dict itself"""
+    serialized = orjson.dumps(journey_data, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return hashlib.blake2b(serialized, digest_size=16).hexdigest()
+
+@st.cache_data(show_spinner=False)
+def _overview_payload(journey_id: str, _journey_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive overview chart data and persona deltas; cached on the journey content hash"""
+    episodes = _journey_data.get('episodes', [])
+    persona_states = _journey_data.get('persona_evolution', [])
+    
+    persona_deltas = {}
+    if persona_states:
+        initial_persona = persona_states[0]
+        latest_persona = persona_states[-1]
+        persona_deltas = {
+            attribute: AdvancedDashboard._calculate_persona_change(initial_persona, latest_persona, attribute)
+            for attribute in ('engagement_level', 'health_awareness', 'trust_level')
+        }
+    
+    return {
+        'timeline_df': AdvancedDashboard._build_episode_timeline_df(episodes),
+        'outcome_counts': AdvancedDashboard._count_outcomes(episodes),
+        'persona_deltas': persona_deltas
+    }
+
+@st.cache_data(show_spinner=False)
+def _overview_metrics(summary_hash: int, _summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Format the overview metric row from summary stats; cached on the summary's content hash"""
+    total_episodes = _summary.get('total_episodes', 0)
+    member_initiated = _summary.get('member_initiated_episodes', 0)
+    
+    return {
+        'total_episodes': total_episodes,
+        'avg_duration': f"{_summary.get('avg_episode_duration_hours', 0):.1f}h",
+        'avg_response': f"{_summary.get('avg_response_time_minutes', 0):.0f}m",
+        'member_initiative': f"{member_initiated / (total_episodes or 1):.1%}"
+    }
+
+# -------- Persona scales ----------
+# Persona attribute values ordered lowest to highest, with their directional scores
+_PERSONA_SCORES = {
+    'engagement_level': {'low': 1, 'medium': 2, 'high': 3},
+    'health_awareness': {'passive': 1, 'reactive': 2, 'proactive': 3},
+    'trust_level': {'skeptical': 1, 'building': 2, 'high': 3}
+}
+
+# -------- Line chart downsampling ----------
+# Roughly the number of points a chart can actually display
+MAX_LINE_POINTS = 1500
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: pick n_out point indices that preserve the visual shape of (x, y)"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    y = np.nan_to_num(y)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    # Interior points are split into n_out - 2 buckets; one point is kept per bucket
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        # Triangle area between the previously selected point, each candidate, and the next bucket's average
+        areas = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected]) -
+            (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(np.argmax(areas))
+        indices[i + 1] = selected
+    
+    return indices
+
+def _downsample_series(df: pd.DataFrame, x: str, y: str, n_out: int = MAX_LINE_POINTS) -> pd.DataFrame:
+    """Downsample a line series with LTTB before handing it to Plotly"""
+    if len(df) <= n_out:
+        return df
+    
+    indices = _lttb_indices(df[x].to_numpy(dtype=float), df[y].to_numpy(dtype=float), n_out)
+    return df.iloc[indices]
+
+# -------- Cached figures ----------
+@st.cache_data(show_spinner=False)
+def _line_figure(df: pd.DataFrame, x: str, y: str, title: str) -> Any:
+    """Line chart over the given columns; rebuilt only when the data or title change"""
+    import plotly.express as px
+    return px.line(df, x=x, y=y, title=title)
+
+@st.cache_data(show_spinner=False)
+def _bar_figure(df: pd.DataFrame, x: str, y: str, title: str) -> Any:
+    """Bar chart over the given columns; rebuilt only when the data or title change"""
+    import plotly.express as px
+    return px.bar(df, x=x, y=y, title=title)
+
+@st.cache_data(show_spinner=False)
+def _pie_figure(counts: pd.Series, title: str) -> Any:
+    """Pie chart of a value_counts() series"""
+    import plotly.express as px
+    return px.pie(values=counts.values, names=counts.index, title=title)
+
+@st.cache_data(show_spinner=False)
+def _performance_figure(df: pd.DataFrame) -> Any:
+    """Response time vs resolution time scatter for the comparative analysis"""
+    import plotly.express as px
+    return px.scatter(
+        df,
+        x='response_time_minutes',
+        y='time_to_resolution_hours',
+        color='trigger_type',
+        size='message_count',
+        hover_data=['title', 'outcome_type'],
+        title="Response Time vs Resolution Time",
+        labels={
+            'response_time_minutes': 'First Response Time (minutes)',
+            'time_to_resolution_hours': 'Total Resolution Time (hours)'
+        }
+    )
+
 class AdvancedDashboard:
     """Advanced dashboard for member journey visualization"""
     
     def __init__(self):
-        self.journey_analyzer = JourneyAnalyzer()
-        self.decision_visualizer = DecisionVisualizer()
+        self.journey_analyzer = _get_analyzer()
+        self.decision_visualizer = _get_visualizer()
         
         # Initialize session state
         if 'journey_data' not in st.session_state:
@@ -72,11 +248,10 @@ class AdvancedDashboard:
             
             if st.sidebar.button("🔄 Load All Data"):
                 with st.spinner("Analyzing journey data..."):
-                    journey_data = self.journey_analyzer.analyze_journey(checkpoint_files)
+                    files_with_mtime = tuple(sorted((f, os.path.getmtime(f)) for f in checkpoint_files))
+                    journey_data = _load_journey(files_with_mtime)
                     # Store in session state
-                    st.session_state.journey_data = journey_data
-                    st.session_state.data_loaded = True
-                    self.journey_data = journey_data
+                    self._store_journey_data(journey_data)
                 st.sidebar.success("✅ Data loaded successfully!")
                 st.rerun()
         else:
@@ -90,21 +265,15 @@ class AdvancedDashboard:
             )
             
             if uploaded_files and st.sidebar.button("Process Uploaded Files"):
-                # Save uploaded files temporarily and process
-                temp_files = []
-                for uploaded_file in uploaded_files:
-                    temp_path = f"temp_{uploaded_file.name}"
-                    with open(temp_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-                    temp_files.append(temp_path)
+                contents = tuple(bytes(uploaded_file.getbuffer()) for uploaded_file in uploaded_files)
+                upload_key = tuple(
+                    (uploaded_file.name, hashlib.sha1(content).hexdigest())
+                    for uploaded_file, content in zip(uploaded_files, contents)
+                )
                 
                 with st.spinner("Processing uploaded data..."):
-                    self.journey_data = self.journey_analyzer.analyze_journey(temp_files)
-                
-                # Clean up temp files
-                import os
-                for temp_file in temp_files:
-                    os.remove(temp_file)
+                    journey_data = _load_uploaded_journey(upload_key, contents)
+                    self._store_journey_data(journey_data)
                 
                 st.sidebar.success("✅ Uploaded data processed!")
                 st.rerun()
@@ -134,8 +303,22 @@ class AdvancedDashboard:
             )
             st.session_state['view_mode'] = view_mode
     
+    def _store_journey_data(self, journey_data: Dict[str, Any]):
+        """Store analyzed journey data in session state along with derived lookup arrays"""
+        st.session_state.journey_data = journey_data
+        st.session_state.data_loaded = True
+        st.session_state.journey_hash = _journey_hash(journey_data)
+        # Episode start weeks, used for vectorized week-range filtering
+        st.session_state.episode_starts = np.fromiter(
+            (ep['week_range'][0] for ep in journey_data.get('episodes', [])),
+            dtype=np.int32
+        )
+        self.journey_data = journey_data
+    
     def _render_welcome_screen(self):
         """Render welcome screen when no data is loaded"""
+        import plotly.graph_objects as go
+        
         st.markdown("""
         ## 👋 Welcome to the Elyx Member Journey Dashboard
         
@@ -171,20 +354,24 @@ class AdvancedDashboard:
         
         with col1:
             st.subheader("📈 Sample Episode Timeline")
-            sample_episodes_df = pd.DataFrame([
-                {"Episode": "Initial Onboarding", "Start": "2024-01-01", "Duration": 3, "Outcome": "Plan Proposed"},
-                {"Episode": "Sleep Data Review", "Start": "2024-01-05", "Duration": 1, "Outcome": "Protocol Implemented"},
-                {"Episode": "Travel Planning", "Start": "2024-01-12", "Duration": 2, "Outcome": "Guidance Provided"},
-            ])
+            sample_episodes = ["Initial Onboarding", "Sleep Data Review", "Travel Planning"]
+            sample_starts = ["2024-01-01", "2024-01-05", "2024-01-12"]
+            sample_outcomes = ["Plan Proposed", "Protocol Implemented", "Guidance Provided"]
             
-            fig = px.timeline(
-                sample_episodes_df,
-                x_start="Start",
-                x_end="Start",  # Will be calculated
-                y="Episode",
-                color="Outcome",
-                title="Member Episode Timeline (Sample)"
-            )
+            fig = go.Figure(go.Scattergl(
+                x=sample_starts,
+                y=sample_episodes,
+                mode='markers',
+                marker=dict(
+                    color=list(range(len(sample_outcomes))),
+                    colorscale='Viridis',
+                    symbol='diamond',
+                    size=14
+                ),
+                customdata=sample_outcomes,
+                hovertemplate="<b>%{y}</b><br>%{x}<br>%{customdata}<extra></extra>"
+            ))
+            fig.update_layout(title="Member Episode Timeline (Sample)")
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
@@ -230,41 +417,40 @@ class AdvancedDashboard:
         
         # Key metrics
         summary = self.journey_data.get('summary_stats', {})
-        episodes = self.journey_data.get('episodes', [])
         persona_states = self.journey_data.get('persona_evolution', [])
         
+        journey_id = st.session_state.get('journey_hash') or _journey_hash(self.journey_data)
+        overview = _overview_payload(journey_id, self.journey_data)
+        metrics = _overview_metrics(hash(frozenset(summary.items())), summary)
+        
         # Top metrics row
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric(
                 "Total Episodes",
-                summary.get('total_episodes', 0),
+                metrics['total_episodes'],
                 help="Distinct health journey episodes"
             )
         
         with col2:
-            avg_duration = summary.get('avg_episode_duration_hours', 0)
             st.metric(
                 "Avg Episode Duration",
-                f"{avg_duration:.1f}h",
+                metrics['avg_duration'],
                 help="Average time to resolve episodes"
             )
         
         with col3:
-            avg_response = summary.get('avg_response_time_minutes', 0)
             st.metric(
                 "Avg Response Time",
-                f"{avg_response:.0f}m",
+                metrics['avg_response'],
                 help="Average first response time"
             )
         
         with col4:
-            member_initiated = summary.get('member_initiated_episodes', 0)
-            total = summary.get('total_episodes', 1)
             st.metric(
                 "Member Initiative",
-                f"{member_initiated/total:.1%}",
+                metrics['member_initiative'],
                 help="Percentage of member-initiated episodes"
             )
         
@@ -273,17 +459,17 @@ class AdvancedDashboard:
         
         with col1:
             # Episode timeline
-            self._render_episode_timeline(episodes)
+            self._render_episode_timeline(overview['timeline_df'])
         
         with col2:
             # Episode outcomes distribution
-            self._render_outcome_distribution(episodes)
+            self._render_outcome_distribution(overview['outcome_counts'])
         
         # Persona evolution summary
         st.subheader("👤 Persona Evolution Summary")
         if persona_states:
             latest_persona = persona_states[-1]
-            initial_persona = persona_states[0]
+            persona_deltas = overview['persona_deltas']
             
             col1, col2, col3 = st.columns(3)
             
@@ -291,35 +477,41 @@ class AdvancedDashboard:
                 st.metric(
                     "Current Engagement",
                     latest_persona['engagement_level'].title(),
-                    delta=self._calculate_persona_change(initial_persona, latest_persona, 'engagement_level')
+                    delta=persona_deltas['engagement_level']
                 )
             
             with col2:
                 st.metric(
                     "Health Awareness",
                     latest_persona['health_awareness'].title(),
-                    delta=self._calculate_persona_change(initial_persona, latest_persona, 'health_awareness')
+                    delta=persona_deltas['health_awareness']
                 )
             
             with col3:
                 st.metric(
                     "Trust Level",
                     latest_persona['trust_level'].title(),
-                    delta=self._calculate_persona_change(initial_persona, latest_persona, 'trust_level')
+                    delta=persona_deltas['trust_level']
                 )
     
     def _render_episode_analysis(self):
         """Render episode analysis dashboard"""
+        import pandas as pd
+        import plotly.graph_objects as go
+        
         st.header("📋 Episode Analysis")
         
         episodes = self.journey_data.get('episodes', [])
         week_range = st.session_state.get('week_range', (1, 35))
         
         # Filter episodes by week range
-        filtered_episodes = [
-            ep for ep in episodes 
-            if week_range[0] <= ep['week_range'][0] <= week_range[1]
-        ]
+        starts = st.session_state.get('episode_starts')
+        if starts is None or len(starts) != len(episodes):
+            starts = np.fromiter((ep['week_range'][0] for ep in episodes), dtype=np.int32)
+            st.session_state.episode_starts = starts
+        
+        idx = np.flatnonzero((starts >= week_range[0]) & (starts <= week_range[1]))
+        filtered_episodes = [episodes[i] for i in idx]
         
         if not filtered_episodes:
             st.warning("No episodes found in the selected week range.")
@@ -385,15 +577,14 @@ class AdvancedDashboard:
         
         # Check if messages are available
         if 'messages' in selected_episode and selected_episode['messages']:
-            messages_df = pd.DataFrame([
-                {
-                    "Timestamp": msg['timestamp'],
-                    "Agent": msg.get('agent', msg['role']),
-                    "Message": msg['text'][:100] + "..." if len(msg['text']) > 100 else msg['text'],
-                    "Role": msg['role']
-                }
-                for msg in selected_episode['messages']
-            ])
+            # Message previews are truncated upstream by the JourneyAnalyzer
+            raw_df = pd.DataFrame(selected_episode['messages'])
+            messages_df = pd.DataFrame({
+                "Timestamp": raw_df['timestamp'],
+                "Agent": raw_df['agent'].fillna(raw_df['role']) if 'agent' in raw_df else raw_df['role'],
+                "Message": raw_df['preview'],
+                "Role": raw_df['role']
+            })
         else:
             st.warning("Message details not available for this episode.")
             messages_df = pd.DataFrame()  # Empty dataframe
@@ -402,18 +593,22 @@ class AdvancedDashboard:
         if not messages_df.empty:
             fig = go.Figure()
             
-            for i, (_, row) in enumerate(messages_df.iterrows()):
-                color = '#FF6B6B' if row['Role'] == 'member' else '#4ECDC4'
-                fig.add_trace(go.Scatter(
-                    x=[i],
-                    y=[0],
-                    mode='markers+text',
-                    text=f"{row['Agent']}<br>{row['Message'][:30]}...",
-                    textposition="top center",
-                    marker=dict(size=20, color=color),
-                    name=row['Role'],
-                    showlegend=i == 0 or (i > 0 and messages_df.iloc[i-1]['Role'] != row['Role'])
-                ))
+            # One trace per role instead of one trace per message
+            positions = np.arange(len(messages_df))
+            labels = messages_df['Agent'].astype(str) + "<br>" + messages_df['Message'].str[:30] + "..."
+            member_mask = messages_df['Role'].eq('member').to_numpy()
+            
+            for mask, name, color in ((member_mask, 'member', '#FF6B6B'), (~member_mask, 'agent', '#4ECDC4')):
+                if mask.any():
+                    fig.add_trace(go.Scattergl(
+                        x=positions[mask],
+                        y=np.zeros(mask.sum()),
+                        mode='markers+text',
+                        text=labels[mask].tolist(),
+                        textposition="top center",
+                        marker=dict(size=20, color=color),
+                        name=name
+                    ))
             
             fig.update_layout(
                 title="Message Flow Timeline",
@@ -440,22 +635,23 @@ class AdvancedDashboard:
             'Response Time (min)', 'Resolution Time (hrs)', 'Outcome'
         ]
         
-        # Display table without PyArrow dependency
+        # Single virtualized table; columns are sortable in the front-end
         st.subheader("Episodes Summary")
-        for idx, row in display_df.iterrows():
-            with st.expander(f"📋 {row['Title']}", expanded=False):
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.write(f"**Trigger Type:** {row['Trigger Type']}")
-                    st.write(f"**Triggered By:** {row['Triggered By']}")
-                    st.write(f"**Duration:** {row['Duration (days)']} days")
-                with col2:
-                    st.write(f"**Response Time:** {row['Response Time (min)']} min")
-                    st.write(f"**Resolution Time:** {row['Resolution Time (hrs)']} hrs")
-                    st.write(f"**Outcome:** {row['Outcome']}")
+        st.dataframe(
+            display_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'Response Time (min)': st.column_config.NumberColumn(format="%.0f"),
+                'Resolution Time (hrs)': st.column_config.NumberColumn(format="%.1f")
+            }
+        )
     
     def _render_persona_evolution(self):
         """Render persona evolution dashboard"""
+        import pandas as pd
+        import plotly.express as px
+        
         st.header("👤 Persona Evolution")
         
         persona_states = self.journey_data.get('persona_evolution', [])
@@ -467,19 +663,28 @@ class AdvancedDashboard:
         # Create persona evolution timeline
         persona_df = pd.DataFrame(persona_states)
         
+        # Map categorical values to numeric for visualization (ordered lowest to highest)
+        persona_scales = [
+            ('engagement_level', 'engagement_numeric'),
+            ('health_awareness', 'awareness_numeric'),
+            ('trust_level', 'trust_numeric')
+        ]
+        for column, numeric_column in persona_scales:
+            persona_df[column] = pd.Categorical(persona_df[column], categories=list(_PERSONA_SCORES[column]), ordered=True)
+            codes = persona_df[column].cat.codes
+            # Unknown values get code -1; keep them missing rather than plotting at 0
+            persona_df[numeric_column] = (codes + 1).where(codes >= 0)
+        
         # Engagement level over time
         st.subheader("📈 Engagement Level Evolution")
         
-        # Map categorical values to numeric for visualization
-        engagement_mapping = {'low': 1, 'medium': 2, 'high': 3}
-        persona_df['engagement_numeric'] = persona_df['engagement_level'].map(engagement_mapping)
-        
         fig_engagement = px.line(
-            persona_df,
+            _downsample_series(persona_df, 'week_index', 'engagement_numeric'),
             x='week_index',
             y='engagement_numeric',
             title="Member Engagement Level Over Time",
-            labels={'engagement_numeric': 'Engagement Level', 'week_index': 'Week'}
+            labels={'engagement_numeric': 'Engagement Level', 'week_index': 'Week'},
+            render_mode='webgl'
         )
         
         # Update y-axis to show categorical labels
@@ -499,14 +704,12 @@ class AdvancedDashboard:
         
         with col1:
             # Health awareness evolution
-            awareness_mapping = {'passive': 1, 'reactive': 2, 'proactive': 3}
-            persona_df['awareness_numeric'] = persona_df['health_awareness'].map(awareness_mapping)
-            
             fig_awareness = px.line(
-                persona_df,
+                _downsample_series(persona_df, 'week_index', 'awareness_numeric'),
                 x='week_index',
                 y='awareness_numeric',
-                title="Health Awareness Evolution"
+                title="Health Awareness Evolution",
+                render_mode='webgl'
             )
             
             fig_awareness.update_layout(
@@ -520,14 +723,12 @@ class AdvancedDashboard:
         
         with col2:
             # Trust level evolution
-            trust_mapping = {'skeptical': 1, 'building': 2, 'high': 3}
-            persona_df['trust_numeric'] = persona_df['trust_level'].map(trust_mapping)
-            
             fig_trust = px.line(
-                persona_df,
+                _downsample_series(persona_df, 'week_index', 'trust_numeric'),
                 x='week_index',
                 y='trust_numeric',
-                title="Trust Level Evolution"
+                title="Trust Level Evolution",
+                render_mode='webgl'
             )
             
             fig_trust.update_layout(
@@ -571,21 +772,16 @@ class AdvancedDashboard:
     
     def _render_decision_traceback(self):
         """Render decision traceback dashboard"""
+        import pandas as pd
+        import plotly.express as px
+        import plotly.graph_objects as go
+        
         st.header("🔍 Decision Traceback Analysis")
         
         # Load checkpoint files to get decision chains
         checkpoint_files = glob.glob("checkpoints/week_*_checkpoint.json")
-        all_decisions = []
-        
-        for file_path in checkpoint_files:
-            with open(file_path, 'r') as f:
-                checkpoint = json.load(f)
-                state = checkpoint['state']
-                
-                # Get all decision chains
-                active_decisions = state.get('active_decision_chains', [])
-                completed_decisions = state.get('completed_decision_chains', [])
-                all_decisions.extend(active_decisions + completed_decisions)
+        files_with_mtime = tuple(sorted((f, os.path.getmtime(f)) for f in checkpoint_files))
+        all_decisions = _load_decision_chains(files_with_mtime)
         
         if not all_decisions:
             st.warning("No decision chains found in the data.")
@@ -602,7 +798,8 @@ class AdvancedDashboard:
         selected_decision = decision_options[selected_decision_key]
         
         # Create decision visualization
-        decision_viz = self.decision_visualizer.create_decision_tree(selected_decision)
+        decision_key = (selected_decision.get('decision_id'), selected_decision.get('updated_at'))
+        decision_viz = _cached_decision_tree(decision_key, selected_decision)
         
         # Decision summary
         st.subheader("📋 Decision Summary")
@@ -634,20 +831,12 @@ class AdvancedDashboard:
         
         fig_network = go.Figure()
         
-        # Add edges
-        for edge in network_data['edges']:
-            fig_network.add_trace(go.Scatter(
-                x=edge['x'],
-                y=edge['y'],
-                mode='lines',
-                line=edge['line'],
-                hoverinfo='text',
-                text=edge.get('text', ''),
-                showlegend=False
-            ))
+        # Add edges: one trace per strength band, edges within it separated by None
+        for edge_trace in network_data['edges']:
+            fig_network.add_trace(go.Scattergl(**edge_trace, showlegend=False))
         
         # Add nodes
-        fig_network.add_trace(go.Scatter(
+        fig_network.add_trace(go.Scattergl(
             x=network_data['nodes']['x'],
             y=network_data['nodes']['y'],
             mode='markers+text',
@@ -655,7 +844,7 @@ class AdvancedDashboard:
             textposition="middle center",
             marker=network_data['nodes']['marker'],
             hovertemplate="<b>%{text}</b><br>%{customdata}<extra></extra>",
-            customdata=[str(cd) for cd in network_data['nodes']['customdata']],
+            customdata=network_data['nodes']['customdata'],
             showlegend=False
         ))
         
@@ -671,16 +860,24 @@ class AdvancedDashboard:
         timeline_df = pd.DataFrame(timeline['events'])
         
         if not timeline_df.empty:
-            # Create timeline visualization
-            fig_timeline = px.timeline(
-                timeline_df,
-                x_start="date",
-                x_end="date",  # Point events
-                y="event",
-                color="type",
-                title="Decision Process Timeline",
-                hover_data=["agent", "description"]
-            )
+            # Point events, drawn as markers rather than zero-width timeline bars
+            fig_timeline = go.Figure(go.Scattergl(
+                x=pd.to_datetime(timeline_df['date'], errors='coerce'),
+                y=timeline_df['event'],
+                mode='markers',
+                marker=dict(
+                    color=pd.Categorical(timeline_df['type']).codes,
+                    colorscale='Viridis',
+                    symbol='diamond',
+                    size=14
+                ),
+                customdata=timeline_df[['type', 'agent', 'description']].to_numpy(),
+                hovertemplate=(
+                    "<b>%{y}</b><br>%{x}<br>Type: %{customdata[0]}<br>"
+                    "Agent: %{customdata[1]}<br>%{customdata[2]}<extra></extra>"
+                )
+            ))
+            fig_timeline.update_layout(title="Decision Process Timeline")
             
             st.plotly_chart(fig_timeline, use_container_width=True)
         
@@ -710,6 +907,8 @@ class AdvancedDashboard:
     
     def _render_internal_metrics(self):
         """Render internal metrics dashboard"""
+        import pandas as pd
+        
         st.header("📊 Internal Metrics & Performance")
         
         metrics = self.journey_data.get('internal_metrics', [])
@@ -721,48 +920,46 @@ class AdvancedDashboard:
         # Create metrics dataframe
         metrics_df = pd.DataFrame(metrics)
         
+        # Each section is a fragment, so interacting with one does not rerun the others
+        self._render_agent_performance(metrics)
+        self._render_decision_quality(metrics_df)
+        self._render_member_engagement(metrics_df)
+        self._render_weekly_metrics(metrics_df)
+    
+    @st.fragment
+    def _render_agent_performance(self, metrics: List[Dict[str, Any]]):
+        """Render agent hours and consultation totals"""
         # Agent performance metrics
         st.subheader("👨‍⚕️ Agent Performance")
         
         # Aggregate agent hours across all weeks
-        all_agent_hours = {}
-        all_consultation_counts = {}
-        
+        hours_records = []
+        consultation_records = []
         for week_metrics in metrics:
-            for agent, hours in week_metrics['agent_hours'].items():
-                all_agent_hours[agent] = all_agent_hours.get(agent, 0) + hours
-            
-            for agent, count in week_metrics['consultation_count'].items():
-                all_consultation_counts[agent] = all_consultation_counts.get(agent, 0) + count
+            hours_records.extend(week_metrics['agent_hours'].items())
+            consultation_records.extend(week_metrics['consultation_count'].items())
         
         col1, col2 = st.columns(2)
         
         with col1:
             # Agent hours chart
-            if all_agent_hours:
-                agent_hours_df = pd.DataFrame(list(all_agent_hours.items()), columns=['Agent', 'Total Hours'])
+            if hours_records:
+                agent_hours_df = self._sum_by_agent(hours_records, 'Total Hours')
                 
-                fig_hours = px.bar(
-                    agent_hours_df,
-                    x='Agent',
-                    y='Total Hours',
-                    title="Total Agent Hours"
-                )
+                fig_hours = _bar_figure(agent_hours_df, 'Agent', 'Total Hours', "Total Agent Hours")
                 st.plotly_chart(fig_hours, use_container_width=True)
         
         with col2:
             # Consultation counts
-            if all_consultation_counts:
-                consultation_df = pd.DataFrame(list(all_consultation_counts.items()), columns=['Agent', 'Consultations'])
+            if consultation_records:
+                consultation_df = self._sum_by_agent(consultation_records, 'Consultations')
                 
-                fig_consultations = px.bar(
-                    consultation_df,
-                    x='Agent',
-                    y='Consultations',
-                    title="Total Consultations"
-                )
+                fig_consultations = _bar_figure(consultation_df, 'Agent', 'Consultations', "Total Consultations")
                 st.plotly_chart(fig_consultations, use_container_width=True)
-        
+    
+    @st.fragment
+    def _render_decision_quality(self, metrics_df: pd.DataFrame):
+        """Render decision quality metrics over time"""
         # Decision quality metrics over time
         st.subheader("🎯 Decision Quality Metrics")
         
@@ -770,24 +967,23 @@ class AdvancedDashboard:
         
         with col1:
             if 'decision_confidence_avg' in metrics_df.columns:
-                fig_confidence = px.line(
-                    metrics_df,
-                    x='week_index',
-                    y='decision_confidence_avg',
-                    title="Average Decision Confidence Over Time"
+                fig_confidence = _line_figure(
+                    metrics_df[['week_index', 'decision_confidence_avg']], 'week_index', 'decision_confidence_avg',
+                    "Average Decision Confidence Over Time"
                 )
                 st.plotly_chart(fig_confidence, use_container_width=True)
         
         with col2:
             if 'decision_implementation_rate' in metrics_df.columns:
-                fig_implementation = px.line(
-                    metrics_df,
-                    x='week_index',
-                    y='decision_implementation_rate',
-                    title="Decision Implementation Rate Over Time"
+                fig_implementation = _line_figure(
+                    metrics_df[['week_index', 'decision_implementation_rate']], 'week_index', 'decision_implementation_rate',
+                    "Decision Implementation Rate Over Time"
                 )
                 st.plotly_chart(fig_implementation, use_container_width=True)
-        
+    
+    @st.fragment
+    def _render_member_engagement(self, metrics_df: pd.DataFrame):
+        """Render member engagement metrics over time"""
         # Member engagement metrics
         st.subheader("👤 Member Engagement Metrics")
         
@@ -795,43 +991,41 @@ class AdvancedDashboard:
         
         with col1:
             if 'member_initiative_messages' in metrics_df.columns:
-                fig_initiative = px.bar(
-                    metrics_df,
-                    x='week_index',
-                    y='member_initiative_messages',
-                    title="Member Initiative Messages per Week"
+                fig_initiative = _bar_figure(
+                    metrics_df[['week_index', 'member_initiative_messages']], 'week_index', 'member_initiative_messages',
+                    "Member Initiative Messages per Week"
                 )
                 st.plotly_chart(fig_initiative, use_container_width=True)
         
         with col2:
             if 'member_response_rate' in metrics_df.columns:
-                fig_response_rate = px.line(
-                    metrics_df,
-                    x='week_index',
-                    y='member_response_rate',
-                    title="Member Response Rate Over Time"
+                fig_response_rate = _line_figure(
+                    metrics_df[['week_index', 'member_response_rate']], 'week_index', 'member_response_rate',
+                    "Member Response Rate Over Time"
                 )
                 st.plotly_chart(fig_response_rate, use_container_width=True)
         
         with col3:
             if 'member_question_complexity' in metrics_df.columns:
-                fig_complexity = px.line(
-                    metrics_df,
-                    x='week_index',
-                    y='member_question_complexity',
-                    title="Question Complexity Over Time"
+                fig_complexity = _line_figure(
+                    metrics_df[['week_index', 'member_question_complexity']], 'week_index', 'member_question_complexity',
+                    "Question Complexity Over Time"
                 )
                 st.plotly_chart(fig_complexity, use_container_width=True)
-        
+    
+    @st.fragment
+    def _render_weekly_metrics(self, metrics_df: pd.DataFrame):
+        """Render the week-by-week metrics breakdown"""
         # Create summary table
         summary_columns = [
             'week_index', 'decision_confidence_avg', 'decision_implementation_rate',
             'member_initiative_messages', 'member_response_rate', 'member_question_complexity'
         ]
         
-        available_columns = [col for col in summary_columns if col in metrics_df.columns]
+        present_columns = set(metrics_df.columns)
+        available_columns = [col for col in summary_columns if col in present_columns]
         if available_columns:
-            display_metrics = metrics_df[available_columns].copy()
+            display_metrics = metrics_df[available_columns]
             # Create new column names for available columns
             column_mapping = {
                 'week_index': 'Week',
@@ -841,29 +1035,34 @@ class AdvancedDashboard:
                 'member_response_rate': 'Response Rate',
                 'member_question_complexity': 'Question Complexity'
             }
-            display_metrics.columns = [column_mapping.get(col, col) for col in available_columns]
+            
+            # Pick each column's formatter once instead of branching per value (first column is the week label)
+            metric_columns = []
+            for col in available_columns[1:]:
+                col_name = column_mapping.get(col, col)
+                if display_metrics[col].dtype.kind != 'f':
+                    formatter = str
+                elif 'Rate' in col_name or 'Confidence' in col_name:
+                    formatter = '{:.1%}'.format
+                else:
+                    formatter = '{:.2f}'.format
+                metric_columns.append((col_name, formatter))
             
             # Display metrics without PyArrow dependency
             st.subheader("📊 Weekly Metrics")
-            for idx, row in display_metrics.iterrows():
-                with st.expander(f"Week {row[display_metrics.columns[0]]}", expanded=False):
+            for week, *values in display_metrics.itertuples(index=False, name=None):
+                with st.expander(f"Week {week}", expanded=False):
                     cols = st.columns(3)
-                    for i, (col_name, value) in enumerate(row.items()):
-                        if i == 0:  # Skip week column
-                            continue
-                        with cols[(i-1) % 3]:
-                            if isinstance(value, float):
-                                if 'Rate' in col_name or 'Confidence' in col_name:
-                                    st.metric(col_name, f"{value:.1%}")
-                                else:
-                                    st.metric(col_name, f"{value:.2f}")
-                            else:
-                                st.metric(col_name, str(value))
+                    for i, ((col_name, formatter), value) in enumerate(zip(metric_columns, values)):
+                        with cols[i % 3]:
+                            st.metric(col_name, formatter(value))
         else:
             st.info("Detailed metrics table not available - summary metrics shown above.")
     
     def _render_comparative_analysis(self):
         """Render comparative analysis dashboard"""
+        import pandas as pd
+        
         st.header("🔄 Comparative Analysis")
         
         episodes = self.journey_data.get('episodes', [])
@@ -874,6 +1073,19 @@ class AdvancedDashboard:
         
         episodes_df = pd.DataFrame(episodes)
         
+        # Each section is a fragment, so interacting with one does not rerun the others
+        self._render_episode_types(episodes_df)
+        self._render_performance_comparison(episodes_df)
+        self._render_agent_collaboration(episodes)
+        self._render_friction_points(episodes)
+        self._render_quality_metrics(episodes_df)
+    
+    @st.fragment
+    def _render_episode_types(self, episodes_df: pd.DataFrame):
+        """Render trigger and outcome type distributions"""
+        # Trigger and outcome counts in one pass
+        type_counts = episodes_df[['trigger_type', 'outcome_type']].melt().groupby(['variable', 'value']).size()
+        
         # Episode type comparison
         st.subheader("📊 Episode Type Analysis")
         
@@ -881,88 +1093,70 @@ class AdvancedDashboard:
         
         with col1:
             # Trigger type distribution
-            trigger_counts = episodes_df['trigger_type'].value_counts()
-            
-            fig_triggers = px.pie(
-                values=trigger_counts.values,
-                names=trigger_counts.index,
-                title="Episodes by Trigger Type"
-            )
+            fig_triggers = _pie_figure(type_counts['trigger_type'], "Episodes by Trigger Type")
             st.plotly_chart(fig_triggers, use_container_width=True)
         
         with col2:
             # Outcome type distribution
-            outcome_counts = episodes_df['outcome_type'].value_counts()
-            
-            fig_outcomes = px.pie(
-                values=outcome_counts.values,
-                names=outcome_counts.index,
-                title="Episodes by Outcome Type"
-            )
+            fig_outcomes = _pie_figure(type_counts['outcome_type'], "Episodes by Outcome Type")
             st.plotly_chart(fig_outcomes, use_container_width=True)
-        
+    
+    @st.fragment
+    def _render_performance_comparison(self, episodes_df: pd.DataFrame):
+        """Render response time vs resolution time comparison"""
         # Performance comparison
         st.subheader("⚡ Performance Comparison")
         
         # Response time vs resolution time scatter
-        fig_performance = px.scatter(
-            episodes_df,
-            x='response_time_minutes',
-            y='time_to_resolution_hours',
-            color='trigger_type',
-            size='message_count',
-            hover_data=['title', 'outcome_type'],
-            title="Response Time vs Resolution Time",
-            labels={
-                'response_time_minutes': 'First Response Time (minutes)',
-                'time_to_resolution_hours': 'Total Resolution Time (hours)'
-            }
-        )
+        fig_performance = _performance_figure(episodes_df[[
+            'response_time_minutes', 'time_to_resolution_hours', 'trigger_type',
+            'message_count', 'title', 'outcome_type'
+        ]])
         
         st.plotly_chart(fig_performance, use_container_width=True)
+    
+    @st.fragment
+    def _render_agent_collaboration(self, episodes: List[Dict[str, Any]]):
+        """Render agent involvement across episodes"""
+        import pandas as pd
         
         # Agent involvement analysis
         st.subheader("👥 Agent Collaboration Analysis")
         
         # Count agent involvement
-        agent_involvement = {}
-        for episode in episodes:
-            for agent in episode['agents_involved']:
-                agent_involvement[agent] = agent_involvement.get(agent, 0) + 1
+        agent_counts = Counter(chain.from_iterable(episode['agents_involved'] for episode in episodes))
         
-        if agent_involvement:
-            agent_df = pd.DataFrame(list(agent_involvement.items()), columns=['Agent', 'Episode Count'])
+        if agent_counts:
+            agent_df = pd.DataFrame(agent_counts.most_common(), columns=['Agent', 'Episode Count'])
             
-            fig_agents = px.bar(
-                agent_df,
-                x='Agent',
-                y='Episode Count',
-                title="Agent Involvement in Episodes"
-            )
+            fig_agents = _bar_figure(agent_df, 'Agent', 'Episode Count', "Agent Involvement in Episodes")
             st.plotly_chart(fig_agents, use_container_width=True)
+    
+    @st.fragment
+    def _render_friction_points(self, episodes: List[Dict[str, Any]]):
+        """Render the most common friction points"""
+        import pandas as pd
         
         # Friction analysis
         st.subheader("⚠️ Friction Point Analysis")
         
-        # Collect all friction points
-        all_friction_points = []
-        for episode in episodes:
-            all_friction_points.extend(episode['friction_points'])
+        # Count friction points across all episodes
+        friction_counts = Counter(chain.from_iterable(episode['friction_points'] for episode in episodes))
         
-        if all_friction_points:
-            friction_counts = pd.Series(all_friction_points).value_counts()
+        if friction_counts:
+            friction_df = pd.DataFrame(friction_counts.most_common(), columns=['Friction Point Type', 'Frequency'])
             
-            fig_friction = px.bar(
-                x=friction_counts.index,
-                y=friction_counts.values,
-                title="Most Common Friction Points"
-            )
-            fig_friction.update_xaxis(title="Friction Point Type")
-            fig_friction.update_yaxis(title="Frequency")
+            fig_friction = _bar_figure(friction_df, 'Friction Point Type', 'Frequency', "Most Common Friction Points")
             
             st.plotly_chart(fig_friction, use_container_width=True)
         else:
             st.info("No friction points detected in the analyzed episodes.")
+    
+    @st.fragment
+    def _render_quality_metrics(self, episodes_df: pd.DataFrame):
+        """Render average timing and friction rate tiles"""
+        # Both timing means in one pass
+        timing_means = episodes_df[['response_time_minutes', 'time_to_resolution_hours']].mean()
         
         # Quality metrics comparison
         st.subheader("📈 Quality Metrics")
@@ -970,39 +1164,50 @@ class AdvancedDashboard:
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            avg_response_time = episodes_df['response_time_minutes'].mean()
-            st.metric("Avg Response Time", f"{avg_response_time:.1f} min")
+            st.metric("Avg Response Time", f"{timing_means['response_time_minutes']:.1f} min")
         
         with col2:
-            avg_resolution_time = episodes_df['time_to_resolution_hours'].mean()
-            st.metric("Avg Resolution Time", f"{avg_resolution_time:.1f} hrs")
+            st.metric("Avg Resolution Time", f"{timing_means['time_to_resolution_hours']:.1f} hrs")
         
         with col3:
-            friction_rate = len([ep for ep in episodes if ep['friction_points']]) / len(episodes) if episodes else 0
+            friction_rate = episodes_df['friction_points'].map(bool).mean()
             st.metric("Friction Rate", f"{friction_rate:.1%}")
     
     # Helper methods
-    def _render_episode_timeline(self, episodes: List[Dict[str, Any]]):
-        """Render episode timeline visualization"""
+    @staticmethod
+    def _sum_by_agent(records: List[Tuple[str, float]], value_column: str) -> pd.DataFrame:
+        """Sum (agent, value) records per agent"""
+        import pandas as pd
+        
+        df = pd.DataFrame(records, columns=['Agent', value_column])
+        df['Agent'] = df['Agent'].astype('category')
+        return df.groupby('Agent', observed=True)[value_column].sum().reset_index()
+    
+    @staticmethod
+    def _build_episode_timeline_df(episodes: List[Dict[str, Any]]) -> Optional[pd.DataFrame]:
+        """Convert episodes to timeline format"""
+        import pandas as pd
+        
         if not episodes:
-            return
+            return None
         
-        # Convert episodes to timeline format
-        timeline_data = []
-        for episode in episodes:
-            start_date = datetime.fromisoformat(episode['start_date'])
-            end_date = datetime.fromisoformat(episode['end_date'])
-            
-            timeline_data.append({
-                'Episode': episode['title'],
-                'Start': episode['start_date'],
-                'End': episode['end_date'],
-                'Duration': episode['duration_days'],
-                'Type': episode['trigger_type'],
-                'Outcome': episode['outcome_type']
-            })
+        # Plotly parses the ISO start/end strings itself, so columns are projected as-is
+        columns = {
+            'title': 'Episode',
+            'start_date': 'Start',
+            'end_date': 'End',
+            'duration_days': 'Duration',
+            'trigger_type': 'Type',
+            'outcome_type': 'Outcome'
+        }
+        return pd.DataFrame(episodes, columns=list(columns)).rename(columns=columns)
+    
+    def _render_episode_timeline(self, timeline_df: Optional[pd.DataFrame]):
+        """Render episode timeline visualization"""
+        import plotly.express as px
         
-        timeline_df = pd.DataFrame(timeline_data)
+        if timeline_df is None or timeline_df.empty:
+            return
         
         fig = px.timeline(
             timeline_df,
@@ -1016,25 +1221,24 @@ class AdvancedDashboard:
         
         st.plotly_chart(fig, use_container_width=True)
     
-    def _render_outcome_distribution(self, episodes: List[Dict[str, Any]]):
+    @staticmethod
+    def _count_outcomes(episodes: List[Dict[str, Any]]) -> pd.Series:
+        """Count episodes per outcome type"""
+        import pandas as pd
+        
+        return pd.Series([episode['outcome_type'] for episode in episodes], dtype=object).value_counts()
+    
+    def _render_outcome_distribution(self, outcome_counts: pd.Series):
         """Render outcome distribution chart"""
-        if not episodes:
+        if outcome_counts.empty:
             return
         
-        outcome_counts = {}
-        for episode in episodes:
-            outcome = episode['outcome_type']
-            outcome_counts[outcome] = outcome_counts.get(outcome, 0) + 1
-        
-        fig = px.pie(
-            values=list(outcome_counts.values()),
-            names=list(outcome_counts.keys()),
-            title="Episode Outcomes"
-        )
+        fig = _pie_figure(outcome_counts, "Episode Outcomes")
         
         st.plotly_chart(fig, use_container_width=True)
     
-    def _calculate_persona_change(self, initial: Dict, latest: Dict, attribute: str) -> str:
+    @staticmethod
+    def _calculate_persona_change(initial: Dict, latest: Dict, attribute: str) -> str:
         """Calculate persona change delta"""
         initial_val = initial.get(attribute, '')
         latest_val = latest.get(attribute, '')
@@ -1042,21 +1246,17 @@ class AdvancedDashboard:
         if initial_val == latest_val:
             return None
         
-        # Simple mapping for directional change
-        improvement_map = {
-            'engagement_level': {'low': 1, 'medium': 2, 'high': 3},
-            'health_awareness': {'passive': 1, 'reactive': 2, 'proactive': 3},
-            'trust_level': {'skeptical': 1, 'building': 2, 'high': 3}
-        }
+        scores = _PERSONA_SCORES.get(attribute)
+        if scores is None:
+            return "Changed"
         
-        if attribute in improvement_map:
-            initial_score = improvement_map[attribute].get(initial_val, 0)
-            latest_score = improvement_map[attribute].get(latest_val, 0)
-            
-            if latest_score > initial_score:
-                return "Improved"
-            elif latest_score < initial_score:
-                return "Declined"
+        initial_score = scores.get(initial_val, 0)
+        latest_score = scores.get(latest_val, 0)
+        
+        if latest_score > initial_score:
+            return "Improved"
+        elif latest_score < initial_score:
+            return "Declined"
         
         return "Changed"
 
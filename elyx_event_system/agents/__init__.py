@@ -7,27 +7,22 @@ from .neel import neel_node
 from .test_panel import test_panel_node
 from .member import init_member_node, member_node
 
-AGENT_KEYS = ["Ruby", "DrWarren", "Advik", "Carla", "Rachel", "Neel", "TestPanel"]
+# Single routing table: (agent key used by the decider, graph node name, node function)
+AGENT_REGISTRY = (
+    ("Ruby", "RubyNode", ruby_node),
+    ("DrWarren", "DrWarrenNode", drwarren_node),
+    ("Advik", "AdvikNode", advik_node),
+    ("Carla", "CarlaNode", carla_node),
+    ("Rachel", "RachelNode", rachel_node),
+    ("Neel", "NeelNode", neel_node),
+    ("TestPanel", "TestPanelNode", test_panel_node)
+)
 
-AGENT_NODE_MAP = {
-    "Ruby": "RubyNode",
-    "DrWarren": "DrWarrenNode",
-    "Advik": "AdvikNode",
-    "Carla": "CarlaNode",
-    "Rachel": "RachelNode",
-    "Neel": "NeelNode",
-    "TestPanel": "TestPanelNode"
-}
+AGENT_KEYS = tuple(key for key, _, _ in AGENT_REGISTRY)
 
-AGENT_FUNC_MAP = {
-    "Ruby": ruby_node,
-    "DrWarren": drwarren_node,
-    "Advik": advik_node,
-    "Carla": carla_node,
-    "Rachel": rachel_node,
-    "Neel": neel_node,
-    "TestPanel": test_panel_node
-}
+AGENT_NODE_MAP = {key: node_name for key, node_name, _ in AGENT_REGISTRY}
+
+AGENT_FUNC_MAP = {key: func for key, _, func in AGENT_REGISTRY}
 
 # Member functions (not part of the agent routing, but used in the graph)
 MEMBER_FUNC_MAP = {
@@ -1,39 +1,47 @@
 # agents/member.py
-import json
-from typing import Dict, Any
-from pprint import pprint
+import logging
+import orjson
+from collections import deque
 # LangChain components and your custom modules
 from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic_core import from_json
 from prompts import MEMBER_PROFILE, INIT_MEMBER_SYSTEM, MEMBER_SYSTEM
 from state import ConversationalState # Assuming state.py is in the parent directory
-from utils import llm, append_message   # Assuming utils.py is in the parent directory
+from utils import llm, cached_invoke, append_message, format_display_time, recent_chat, RECENT_CHAT_WINDOW, member_profile_message, prompt_json   # Assuming utils.py is in the parent directory
+
+log = logging.getLogger("elyx.agents")
+
+# Built once; the system prompts never change between turns
+_INIT_SYSTEM_MESSAGE = SystemMessage(content=INIT_MEMBER_SYSTEM)
+_MEMBER_SYSTEM_MESSAGE = SystemMessage(content=MEMBER_SYSTEM)
 
 def init_member_node(state: ConversationalState) -> ConversationalState:
     """
     Initializes the member's state from the raw profile string.
     This node runs only once at the beginning of the graph execution.
     """
-    print("--- Running Node: init_member_node ---")
+    log.info("--- Running Node: init_member_node ---")
     model = llm(temperature=0.4) # Low temperature for deterministic JSON output
 
     # The LLM's task is to convert the unstructured profile into a structured state
-    content = model.invoke([
-        SystemMessage(content=INIT_MEMBER_SYSTEM),
+    content = cached_invoke(model, [
+        _INIT_SYSTEM_MESSAGE,
         HumanMessage(content=MEMBER_PROFILE)
-    ]).content
+    ])
 
     try:
         # The LLM should return a clean JSON string
-        initial_member_state = json.loads(content)
-        print(f"  -> Successfully parsed initial member state.")
-    except json.JSONDecodeError:
-        print(f"  -> ERROR: Failed to parse JSON from LLM output: {content}")
+        initial_member_state = orjson.loads(content)
+        log.info("  -> Successfully parsed initial member state.")
+    except orjson.JSONDecodeError:
+        log.error("  -> ERROR: Failed to parse JSON from LLM output: %s", content)
         # Fallback to a default state if parsing fails
         initial_member_state = {"error": "failed_to_initialize"}
 
     # Update the main ConversationalState
     state['member_state'] = initial_member_state
     state['chat_history'] = [] # Start with an empty chat history
+    state['recent_chat'] = deque(maxlen=RECENT_CHAT_WINDOW)
     
     # Preserve week and thread tracking (these should already be set by main.py)
     if 'week_index' not in state:
@@ -51,11 +59,11 @@ def member_node(state: ConversationalState) -> ConversationalState:
     Simulates the member's turn in the conversation. It can either
     initiate a new topic or respond to the Elyx team.
     """
-    print("--- Running Node: member_node ---")
+    log.info("--- Running Node: member_node ---")
     model = llm(temperature=0.8)
     
     # --- NEW LOGIC to determine the task ---
-    chat_history = state.get('chat_history', [])[-10:]
+    chat_history = recent_chat(state, 10)
     new_thread_required = state.get('new_thread_required', False)
 
     if not chat_history:
@@ -74,18 +82,18 @@ def member_node(state: ConversationalState) -> ConversationalState:
     context = {
         "task": task,
         # "task_description": task_description,
-        "member_state": state.get("member_state", {}),
-        "recent_chat": state.get("chat_history", [])[-10:], # Provide last 5 messages for context
+        "recent_chat": chat_history, # Provide last 5 messages for context
         "week_index": state.get("week_index", 1)
     }
 
     content = model.invoke([
-        SystemMessage(content=MEMBER_SYSTEM),
-        HumanMessage(content=json.dumps(context, indent=2))
+        _MEMBER_SYSTEM_MESSAGE,
+        member_profile_message(state),
+        HumanMessage(content=prompt_json(context))
     ]).content
     
     try:
-        payload = json.loads(content)
+        payload = from_json(content, allow_partial='trailing-strings')
         # Ensure the payload has the required keys
         message_text = payload.get("message", "Sorry, I'm not sure what to say.")
         decision = payload.get("decision", "END_TURN")
@@ -94,12 +102,12 @@ def member_node(state: ConversationalState) -> ConversationalState:
         if is_travel_related:
             if 'simulation_counters' in state['member_state']:
                 state['member_state']['simulation_counters']['weeks_since_last_trip'] = 0
-                print("  -> Travel topic detected. Resetting weeks_since_last_trip to 0.")
+                log.info("  -> Travel topic detected. Resetting weeks_since_last_trip to 0.")
             else:
-                print("  -> WARNING: is_travel_related was true but simulation_counters not found in state.")
+                log.warning("  -> WARNING: is_travel_related was true but simulation_counters not found in state.")
 
-    except Exception:
-        print(f"  -> ERROR: Could not parse member_node JSON: {content}")
+    except (ValueError, AttributeError):
+        log.error("  -> ERROR: Could not parse member_node JSON: %s", content)
         message_text = content # Use the raw content as a fallback message
         decision = "END_TURN"
 
@@ -108,25 +116,12 @@ def member_node(state: ConversationalState) -> ConversationalState:
     state['message'] = message_text
     
     # Add the member's message to the history
-    append_message(state, role="member", agent="member", text=message_text, meta={"decision": decision})
+    message = append_message(state, role="member", agent="member", text=message_text, meta={"decision": decision})
     
     # Print the response with timestamp
-    # Get the timestamp from the last message in chat history
-    chat_history = state.get("chat_history", [])
-    if chat_history:
-        timestamp = chat_history[-1].get("timestamp", "")
-        if timestamp:
-            try:
-                from datetime import datetime
-                dt = datetime.fromisoformat(timestamp)
-                time_str = dt.strftime("%a, %b %d, %I:%M %p")
-                print(f"  [{time_str}] Member says: '{message_text}' (Decision: {decision})")
-            except ValueError:
-                print(f"  Member says: '{message_text}' (Decision: {decision})")
-        else:
-            print(f"  Member says: '{message_text}' (Decision: {decision})")
-    else:
-        print(f"  Member says: '{message_text}' (Decision: {decision})")
+    # append_message always stores an ISO timestamp, so it can be formatted directly
+    if log.isEnabledFor(logging.INFO):
+        log.info("  [%s] Member says: '%s' (Decision: %s)", format_display_time(message["timestamp"]), message_text, decision)
     
     # The 'decision' field can now be used by LangGraph's conditional routing
     # to decide whether to go to Ruby or to end the loop.
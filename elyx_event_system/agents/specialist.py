@@ -0,0 +1,49 @@
+# agents/specialist.py
+import logging
+from typing import Type
+from langchain_core.messages import SystemMessage, HumanMessage
+from schemas import AgentPayload, parse_agent_payload, FALLBACK_MESSAGE
+from utils import llm, record_agent_turn, format_display_time, recent_chat, member_profile_message, prompt_json
+from state import ConversationalState
+
+log = logging.getLogger("elyx.agents")
+
+def run_specialist(state: ConversationalState, *, agent: str, role: str, system_message: SystemMessage,
+                   temperature: float = 0.6, schema: Type[AgentPayload] = AgentPayload) -> ConversationalState:
+    """
+    Shared turn for the Elyx specialist agents: prompt the model with the
+    member's message and recent chat, record the structured reply, and hand
+    the reply text on as the next message.
+    """
+    model = llm(temperature=temperature)
+
+    # Build context from shared state
+    context = {
+        "message": state.get("message", ""),
+        "recent_chat": recent_chat(state, 10),
+        "week_index": state.get("week_index", 0),
+        "current_agent": state.get("current_agent", agent)
+    }
+
+    content = model.invoke([
+        system_message,
+        member_profile_message(state),
+        HumanMessage(content=prompt_json(context))
+    ]).content
+
+    payload = parse_agent_payload(content, agent, schema)
+
+    # Update shared state
+    message = record_agent_turn(state, payload, role, agent)
+
+    # Print the response with timestamp
+    message_text = payload.get("message", "")
+    # append_message always stores an ISO timestamp, so it can be formatted directly
+    if log.isEnabledFor(logging.INFO):
+        log.info("  [%s] %s says: '%s'", format_display_time(message["timestamp"]), agent, message_text)
+
+    # Update the message field in state for the next iteration
+    # Ensure we only store the message text, not the full JSON
+    state['message'] = message_text or FALLBACK_MESSAGE
+
+    return state
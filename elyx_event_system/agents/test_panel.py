@@ -1,24 +1,59 @@
 # agents/test_panel.py
-import json
-from typing import Dict, Any
+import copy
+import hashlib
+import logging
+from datetime import timedelta
+from groq import BadRequestError
 from langchain_core.messages import SystemMessage, HumanMessage
+from schemas import parse_agent_payload, FALLBACK_MESSAGE, TestPanelPayload
 from prompts import TEST_PANEL_SYSTEM
-from utils import llm, append_message, append_agent_response
+from utils import llm, cached_invoke, calculate_conversation_timestamp, record_agent_turn, format_display_time, recent_chat, member_profile_message, prompt_json
 from state import ConversationalState
-from pprint import pprint
+
+log = logging.getLogger("elyx.agents")
+
+# Built once; the system prompt never changes between turns
+_SYSTEM_MESSAGE = SystemMessage(content=TEST_PANEL_SYSTEM)
+
+NO_PENDING_TESTS_MESSAGE = "No diagnostic events are pending, so there are no new test results yet."
+
+# Validated once at import; the turns without diagnostic events copy it
+_NO_PENDING_TESTS_PAYLOAD = TestPanelPayload(
+    agent="TestPanel",
+    message=NO_PENDING_TESTS_MESSAGE,
+    analysis="No diagnostic events pending",
+    confidence=0.0
+).model_dump()
+
+def _panel_key(state: ConversationalState, diagnostic_events) -> str:
+    """Digest of what a diagnostic panel depends on: the member state and the events being processed"""
+    inputs = prompt_json({
+        "member_state": state.get("member_state", {}),
+        "events": [event.get("event_id") for event in diagnostic_events]
+    })
+    return hashlib.blake2b(inputs.encode(), digest_size=16).hexdigest()
+
+def _stamp_panel(state: ConversationalState, payload: dict):
+    """Date a panel payload to the current simulation week (TestPanelResults fields)"""
+    test_date = calculate_conversation_timestamp(state.get("week_index", 1), state.get("thread_index", 1),
+                                                 state.get("message_in_thread", 0))
+    payload["week_index"] = state.get("week_index", 0)
+    payload["test_date"] = test_date.strftime("%Y-%m-%d")
+    # Diagnostics repeat every 12 weeks
+    payload["next_assessment_due"] = (test_date + timedelta(weeks=12)).strftime("%Y-%m-%d")
 
 def test_panel_node(state: ConversationalState) -> ConversationalState:
     """
     TestPanel agent that handles comprehensive diagnostic testing and generates
     realistic test results based on the member's conversation history.
     """
-    model = llm(temperature=0.3)  # Low temperature for consistent medical results
+    # Low temperature for consistent medical results; JSON mode so the structured test results always parse
+    model = llm(temperature=0.3, json_mode=True)
     
     # Build context from shared state
     context = {
         "message": state.get("message", ""),
-        "member_state": state.get("member_state", {}),
-        "recent_chat": state.get("chat_history", [])[-20:],  
+        "recent_chat": recent_chat(state),
         "current_agent": state.get("current_agent", "TestPanel"),
         "active_events": state.get("active_events", [])
     }
@@ -28,94 +63,49 @@ def test_panel_node(state: ConversationalState) -> ConversationalState:
                         if event.get("Type") == "Diagnostic" and event.get("status") == "proposed"]
     
     if diagnostic_events:
-        # Process diagnostic testing
-        content = model.invoke([
-            SystemMessage(content=TEST_PANEL_SYSTEM),
-            HumanMessage(content=json.dumps(context, indent=2))
-        ]).content
+        # Same pending diagnostics for an unchanged member: the panel's results would not change
+        panel_key = _panel_key(state, diagnostic_events)
+        last_panel = state.get("last_test_panel") or {}
+        if last_panel.get("key") == panel_key:
+            log.info("  -> TestPanel inputs unchanged since week %s, reusing its results.", last_panel.get("week_index"))
+            # Deep copy: the stored panel's nested results must not be shared with this turn's record
+            payload = copy.deepcopy(last_panel["payload"])
+            _stamp_panel(state, payload)
+        else:
+            # Process diagnostic testing
+            messages = [
+                _SYSTEM_MESSAGE,
+                member_profile_message(state),
+                HumanMessage(content=prompt_json(context))
+            ]
+            try:
+                content = cached_invoke(model, messages)
+            except BadRequestError as e:
+                # Groq rejects JSON-mode output that fails validation (json_validate_failed);
+                # retry once without JSON mode so parse_agent_payload can fall back to the raw text
+                log.warning("  -> TestPanel JSON-mode reply rejected (%s), retrying without JSON mode.", e)
+                content = cached_invoke(llm(temperature=0.3), messages)
+            payload = parse_agent_payload(content, "TestPanel", TestPanelPayload)
+            # Only a reply carrying test results is worth reusing; a malformed one is retried next visit
+            if "comprehensive_test_results" in payload:
+                _stamp_panel(state, payload)
+                state["last_test_panel"] = {"week_index": state.get("week_index", 0), "key": panel_key,
+                                            "payload": copy.deepcopy(payload)}
     else:
-        # No diagnostic events - provide general health assessment
-        content = model.invoke([
-            SystemMessage(content=TEST_PANEL_SYSTEM),
-            HumanMessage(content=json.dumps(context, indent=2))
-        ]).content
-
-    try:
-        payload = json.loads(content)
-        # Validate payload structure
-        if "agent" not in payload:
-            payload["agent"] = "TestPanel"
-        if "message" not in payload:
-            payload["message"] = content
-        if "proposed_event" not in payload:
-            payload["proposed_event"] = None
-        if "needs_expert" not in payload:
-            payload["needs_expert"] = "false"
-        if "expert_needed" not in payload:
-            payload["expert_needed"] = None
-        if "routing_reason" not in payload:
-            payload["routing_reason"] = ""
-        if "analysis" not in payload:
-            payload["analysis"] = "Comprehensive health assessment completed"
-        if "recommendations" not in payload:
-            payload["recommendations"] = []
-        if "medications" not in payload:
-            payload["medications"] = []
-        if "tests" not in payload:
-            payload["tests"] = []
-        if "confidence" not in payload:
-            payload["confidence"] = 0.9
-    except Exception:
-        payload = {
-            "agent": "TestPanel", 
-            "message": content, 
-            "proposed_event": None,
-            "needs_expert": "false",
-            "expert_needed": None,
-            "routing_reason": "",
-            "analysis": "Comprehensive health assessment completed",
-            "recommendations": [],
-            "medications": [],
-            "tests": [],
-            "confidence": 0.9
-        }
+        # No diagnostic events - nothing to test, so skip the LLM round trip
+        # Fresh lists so no turn's payload shares mutable state with the template
+        payload = {**_NO_PENDING_TESTS_PAYLOAD, "recommendations": [], "medications": [], "tests": []}
 
     # Update shared state
-    append_agent_response(state, payload)
-    append_message(state, role="test_panel", agent="TestPanel", text=payload.get("message", ""), 
-                  meta={"source": "agent", "week_index": state.get("week_index", 0)})
+    message = record_agent_turn(state, payload, "test_panel", "TestPanel")
     
     # Print the response with timestamp
     message_text = payload.get("message", "")
-    # Get the timestamp from the last message in chat history
-    chat_history = state.get("chat_history", [])
-    if chat_history:
-        timestamp = chat_history[-1].get("timestamp", "")
-        if timestamp:
-            try:
-                from datetime import datetime
-                dt = datetime.fromisoformat(timestamp)
-                time_str = dt.strftime("%a, %b %d, %I:%M %p")
-                print(f"  [{time_str}] TestPanel says: '{message_text}'")
-            except ValueError:
-                print(f"  TestPanel says: '{message_text}'")
-        else:
-            print(f"  TestPanel says: '{message_text}'")
-    else:
-        print(f"  TestPanel says: '{message_text}'")
+    # append_message always stores an ISO timestamp, so it can be formatted directly
+    if log.isEnabledFor(logging.INFO):
+        log.info("  [%s] TestPanel says: '%s'", format_display_time(message["timestamp"]), message_text)
     
     # Ensure we only store the message text, not the full JSON
-    message_text = payload.get("message", "")
-    if not message_text and isinstance(content, str):
-        # If no message field, try to extract just the message from the content
-        try:
-            # Try to parse the content as JSON and extract just the message
-            parsed_content = json.loads(content)
-            message_text = parsed_content.get("message", "I apologize, but I couldn't generate a proper response.")
-        except:
-            # If parsing fails, use a generic message
-            message_text = "I apologize, but I couldn't generate a proper response."
-    
-    state['message'] = message_text
+    state['message'] = message_text or FALLBACK_MESSAGE
     
     return state
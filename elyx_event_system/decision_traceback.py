@@ -4,165 +4,104 @@ Decision Traceback Utilities
 Functions to query and analyze decision chains for traceability.
 """
 
+from collections import Counter
+from itertools import chain as chain_iter
 from typing import List, Dict, Any, Optional
 from state import ConversationalState
 
-def get_decision_by_id(state: ConversationalState, decision_id: str) -> Optional[Dict[str, Any]]:
-    """Get a specific decision chain by its ID"""
-    # Check active chains first
+# -------- Decision chain index ----------
+def _add_to_index(index: Dict[str, Any], chain: Dict[str, Any]):
+    index["by_id"][chain.get("decision_id")] = chain
+    index["by_member"].setdefault(chain.get("member_id"), []).append(chain)
+    index["by_week"].setdefault(chain.get("week_index"), []).append(chain)
+    for analysis in chain.get("agent_analyses", []):
+        _index_analysis(index, chain, analysis)
+    index["size"] += 1
+
+def _index_analysis(index: Dict[str, Any], chain: Dict[str, Any], analysis: Dict[str, Any]):
+    # Buckets map decision_id -> chain: a set of ids that also keeps creation order
+    decision_id = chain.get("decision_id")
+    index["by_agent"].setdefault(analysis.get("agent_name"), {})[decision_id] = chain
+    for intervention in analysis.get("interventions", []):
+        index["by_intervention"].setdefault(intervention, {})[decision_id] = chain
+
+def _chain_search_text(chain: Dict[str, Any]) -> str:
+    # Lowercased once per chain; NUL separators keep a keyword from matching across two fields
+    parts = [chain.get("triggering_event", "")]
+    parts.extend(" ".join(analysis.get("analysis", [])) for analysis in chain.get("agent_analyses", []))
+    return "\0".join(parts).lower()
+
+def decision_index(state: ConversationalState) -> Dict[str, Any]:
+    """Lookup tables over all decision chains, rebuilt if missing or out of step (e.g. after loading a checkpoint)"""
     active_chains = state.get("active_decision_chains", [])
-    for chain in active_chains:
-        if chain.get("decision_id") == decision_id:
-            return chain
-    
-    # Check completed chains
     completed_chains = state.get("completed_decision_chains", [])
-    for chain in completed_chains:
-        if chain.get("decision_id") == decision_id:
-            return chain
-    
-    return None
+    index = state.get("decision_index")
+    # Chains only move between the two lists, so the total count detects chains added outside add_active_decision_chain
+    if not index or index["size"] != len(active_chains) + len(completed_chains):
+        index = {"by_id": {}, "by_member": {}, "by_week": {}, "by_agent": {}, "by_intervention": {},
+                 "search_text": {}, "size": 0}
+        for chain in chain_iter(active_chains, completed_chains):
+            _add_to_index(index, chain)
+        state["decision_index"] = index
+    return index
+
+def add_active_decision_chain(state: ConversationalState, chain: Dict[str, Any]):
+    """Append a new chain to active_decision_chains and to the index"""
+    index = decision_index(state)
+    active_chains = state.get("active_decision_chains", [])
+    active_chains.append(chain)
+    state["active_decision_chains"] = active_chains
+    _add_to_index(index, chain)
+
+def add_chain_analysis(state: ConversationalState, chain: Dict[str, Any], analysis: Dict[str, Any]):
+    """Append an agent analysis to a chain and to the agent/intervention index"""
+    index = decision_index(state)
+    chain["agent_analyses"].append(analysis)
+    _index_analysis(index, chain, analysis)
+    # The cached keyword text no longer covers this chain
+    index["search_text"].pop(chain.get("decision_id"), None)
+
+def get_decision_by_id(state: ConversationalState, decision_id: str) -> Optional[Dict[str, Any]]:
+    """Get a specific decision chain by its ID"""
+    return decision_index(state)["by_id"].get(decision_id)
 
 def get_member_decision_history(state: ConversationalState, member_name: str) -> List[Dict[str, Any]]:
     """Get all decision chains for a specific member"""
-    all_decisions = []
-    
-    # Get active chains
-    active_chains = state.get("active_decision_chains", [])
-    for chain in active_chains:
-        if chain.get("member_id") == member_name:
-            all_decisions.append(chain)
-    
-    # Get completed chains
-    completed_chains = state.get("completed_decision_chains", [])
-    for chain in completed_chains:
-        if chain.get("member_id") == member_name:
-            all_decisions.append(chain)
-    
-    return all_decisions
+    return list(decision_index(state)["by_member"].get(member_name, ()))
 
 def get_decisions_by_week(state: ConversationalState, week_index: int) -> List[Dict[str, Any]]:
     """Get all decision chains from a specific week"""
-    all_decisions = []
-    
-    # Get active chains
-    active_chains = state.get("active_decision_chains", [])
-    for chain in active_chains:
-        if chain.get("week_index") == week_index:
-            all_decisions.append(chain)
-    
-    # Get completed chains
-    completed_chains = state.get("completed_decision_chains", [])
-    for chain in completed_chains:
-        if chain.get("week_index") == week_index:
-            all_decisions.append(chain)
-    
-    return all_decisions
+    return list(decision_index(state)["by_week"].get(week_index, ()))
 
 def get_decisions_by_agent(state: ConversationalState, agent_name: str) -> List[Dict[str, Any]]:
     """Get all decision chains involving a specific agent"""
-    all_decisions = []
-    
-    # Get active chains
-    active_chains = state.get("active_decision_chains", [])
-    for chain in active_chains:
-        agent_analyses = chain.get("agent_analyses", [])
-        if any(analysis.get("agent_name") == agent_name for analysis in agent_analyses):
-            all_decisions.append(chain)
-    
-    # Get completed chains
-    completed_chains = state.get("completed_decision_chains", [])
-    for chain in completed_chains:
-        agent_analyses = chain.get("agent_analyses", [])
-        if any(analysis.get("agent_name") == agent_name for analysis in agent_analyses):
-            all_decisions.append(chain)
-    
-    return all_decisions
+    return list(decision_index(state)["by_agent"].get(agent_name, {}).values())
 
 def get_decisions_by_confidence(state: ConversationalState, min_confidence: float = 0.8) -> List[Dict[str, Any]]:
     """Get decision chains with confidence above threshold"""
-    all_decisions = []
-    
-    # Get active chains
-    active_chains = state.get("active_decision_chains", [])
-    for chain in active_chains:
-        agent_analyses = chain.get("agent_analyses", [])
-        if any(analysis.get("confidence_level", 0) >= min_confidence for analysis in agent_analyses):
-            all_decisions.append(chain)
-    
-    # Get completed chains
-    completed_chains = state.get("completed_decision_chains", [])
-    for chain in completed_chains:
-        agent_analyses = chain.get("agent_analyses", [])
-        if any(analysis.get("confidence_level", 0) >= min_confidence for analysis in agent_analyses):
-            all_decisions.append(chain)
-    
-    return all_decisions
+    # Bind dict.get once for the nested scan over every analysis
+    get = dict.get
+    return [chain for chain in decision_index(state)["by_id"].values()
+            if any(get(analysis, "confidence_level", 0) >= min_confidence
+                   for analysis in get(chain, "agent_analyses", ()))]
 
 def search_decisions_by_intervention(state: ConversationalState, intervention: str) -> List[Dict[str, Any]]:
     """Search for decision chains that include a specific intervention (medication, test, etc.)"""
-    all_decisions = []
-    
-    # Get active chains
-    active_chains = state.get("active_decision_chains", [])
-    for chain in active_chains:
-        agent_analyses = chain.get("agent_analyses", [])
-        for analysis in agent_analyses:
-            interventions = analysis.get("interventions", [])
-            if intervention in interventions:
-                all_decisions.append(chain)
-                break
-    
-    # Get completed chains
-    completed_chains = state.get("completed_decision_chains", [])
-    for chain in completed_chains:
-        agent_analyses = chain.get("agent_analyses", [])
-        for analysis in agent_analyses:
-            interventions = analysis.get("interventions", [])
-            if intervention in interventions:
-                all_decisions.append(chain)
-                break
-    
-    return all_decisions
+    return list(decision_index(state)["by_intervention"].get(intervention, {}).values())
 
 def search_decisions_by_keyword(state: ConversationalState, keyword: str) -> List[Dict[str, Any]]:
     """Search for decision chains containing specific keywords"""
-    all_decisions = []
     keyword_lower = keyword.lower()
-    
-    # Get active chains
-    active_chains = state.get("active_decision_chains", [])
-    for chain in active_chains:
-        # Search in triggering event
-        if keyword_lower in chain.get("triggering_event", "").lower():
-            all_decisions.append(chain)
-            continue
-        
-        # Search in agent analyses
-        agent_analyses = chain.get("agent_analyses", [])
-        for analysis in agent_analyses:
-            analysis_text = " ".join(analysis.get("analysis", []))
-            if keyword_lower in analysis_text.lower():
-                all_decisions.append(chain)
-                break
-    
-    # Get completed chains
-    completed_chains = state.get("completed_decision_chains", [])
-    for chain in completed_chains:
-        # Search in triggering event
-        if keyword_lower in chain.get("triggering_event", "").lower():
-            all_decisions.append(chain)
-            continue
-        
-        # Search in agent analyses
-        agent_analyses = chain.get("agent_analyses", [])
-        for analysis in agent_analyses:
-            analysis_text = " ".join(analysis.get("analysis", []))
-            if keyword_lower in analysis_text.lower():
-                all_decisions.append(chain)
-                break
-    
-    return all_decisions
+    index = decision_index(state)
+    search_text = index["search_text"]
+    matches = []
+    for decision_id, chain in index["by_id"].items():
+        text = search_text.get(decision_id)
+        if text is None:
+            text = search_text[decision_id] = _chain_search_text(chain)
+        if keyword_lower in text:
+            matches.append(chain)
+    return matches
 
 def get_active_decisions(state: ConversationalState) -> List[Dict[str, Any]]:
     """Get all active (in-progress) decision chains"""
@@ -174,28 +113,29 @@ def get_completed_decisions(state: ConversationalState) -> List[Dict[str, Any]]:
 
 def format_decision_summary(decision: Dict[str, Any]) -> str:
     """Format a decision chain into a readable summary"""
-    summary = f"""
+    parts = [f"""
 **Decision Chain: {decision.get('decision_id', 'N/A')}**
 - **Trigger**: {decision.get('triggering_event', 'N/A')}
 - **Member**: {decision.get('member_id', 'N/A')}
 - **Status**: {decision.get('status', 'N/A')}
 - **Created**: {decision.get('created_at', 'N/A')}
 
-**Agents Involved**:"""
+**Agents Involved**:"""]
     
     agent_analyses = decision.get("agent_analyses", [])
     for analysis in agent_analyses:
-        summary += f"""
+        parts.append(f"""
   - **{analysis.get('agent_name', 'N/A')}** ({analysis.get('analysis_type', 'N/A')})
     - Confidence: {analysis.get('confidence_level', 0):.1%}
-    - Recommendations: {', '.join(analysis.get('recommendations', []))}"""
+    - Recommendations: {', '.join(analysis.get('recommendations', []))}""")
     
     if decision.get("final_decision"):
-        summary += f"""
+        parts.append(f"""
 **Final Decision**: {decision.get('final_decision', 'N/A')}
-**Outcome**: {decision.get('outcome', 'N/A')}"""
+**Outcome**: {decision.get('outcome', 'N/A')}""")
     
-    return summary
+    # One join instead of re-copying the growing summary for every analysis
+    return "".join(parts)
 
 def get_decision_statistics(state: ConversationalState) -> Dict[str, Any]:
     """Get statistics about all decision chains"""
@@ -204,22 +144,14 @@ def get_decision_statistics(state: ConversationalState) -> Dict[str, Any]:
     
     total_decisions = len(active_chains) + len(completed_chains)
     
-    # Count by agent
-    agent_counts = {}
-    for chain in active_chains + completed_chains:
-        agent_analyses = chain.get("agent_analyses", [])
-        for analysis in agent_analyses:
-            agent_name = analysis.get("agent_name", "Unknown")
-            agent_counts[agent_name] = agent_counts.get(agent_name, 0) + 1
-    
-    # Average confidence
+    # Count by agent and sum confidence in one pass over every analysis
+    agent_counts = Counter()
     total_confidence = 0
     confidence_count = 0
-    for chain in active_chains + completed_chains:
-        agent_analyses = chain.get("agent_analyses", [])
-        for analysis in agent_analyses:
-            confidence = analysis.get("confidence_level", 0)
-            total_confidence += confidence
+    for chain in chain_iter(active_chains, completed_chains):
+        for analysis in chain.get("agent_analyses", ()):
+            agent_counts[analysis.get("agent_name", "Unknown")] += 1
+            total_confidence += analysis.get("confidence_level", 0)
             confidence_count += 1
     
     avg_confidence = total_confidence / confidence_count if confidence_count > 0 else 0
@@ -228,6 +160,6 @@ def get_decision_statistics(state: ConversationalState) -> Dict[str, Any]:
         "total_decisions": total_decisions,
         "active_decisions": len(active_chains),
         "completed_decisions": len(completed_chains),
-        "agent_participation": agent_counts,
+        "agent_participation": dict(agent_counts),
         "average_confidence": avg_confidence
     }
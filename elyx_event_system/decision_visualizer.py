@@ -4,17 +4,52 @@ Decision Traceback Visualization System
 Creates interactive visualizations to trace why decisions were made
 """
 
-import json
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import pandas as pd
-import networkx as nx
-from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+import orjson
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
+from statistics import pvariance
 
-@dataclass
+# Ring color of each node type in the network graph
+_TYPE_COLORS = {
+    'trigger': '#FF6B6B',
+    'evidence': '#4ECDC4',
+    'analysis': '#45B7D1',
+    'risk': '#FFA07A',
+    'decision': '#98D8C8',
+    'outcome': '#F7DC6F'
+}
+
+# Edge strengths are drawn in this many width/opacity bands, one Plotly trace each
+_EDGE_BANDS = 4
+
+# Score of a risk level or impact severity (both use the same scale)
+_SEVERITY_SCORES = {
+    'Low': 0.2,
+    'Medium': 0.5,
+    'High': 0.8,
+    'Critical': 1.0
+}
+
+# Column of each node type in the decision flow, left to right
+_LAYER_X = {'trigger': 0, 'evidence': 1, 'analysis': 2, 'risk': 3, 'decision': 4, 'outcome': 5}
+
+@lru_cache(maxsize=4096)
+def _parse_iso(timestamp: str) -> Optional[datetime]:
+    """Parse an ISO timestamp once per distinct string (None if malformed); datetimes are immutable, so sharing is safe"""
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    # Compare aware timestamps on the same naive UTC axis as naive ones
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@dataclass(slots=True)
 class DecisionNode:
     """Represents a node in the decision tree"""
     node_id: str
@@ -27,7 +62,7 @@ class DecisionNode:
     importance: float  # 0.0 to 1.0
     metadata: Dict[str, Any]
 
-@dataclass
+@dataclass(slots=True)
 class DecisionEdge:
     """Represents a connection between decision nodes"""
     source: str
@@ -37,7 +72,10 @@ class DecisionEdge:
     description: str
 
 class DecisionVisualizer:
-    """Creates visualizations for decision traceability"""
+    """
+    Creates visualizations for decision traceability.
+    Results hold NumPy arrays; callers shipping them as JSON should use to_json().
+    """
     
     def __init__(self):
         self.decision_trees = {}
@@ -68,6 +106,10 @@ class DecisionVisualizer:
             "summary": self._create_decision_summary(decision_chain)
         }
     
+    def to_json(self, result: Dict[str, Any]) -> bytes:
+        """Serialize a visualization result (e.g. from create_decision_tree) to JSON, NumPy arrays included"""
+        return orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    
     def _extract_decision_nodes(self, decision_chain: Dict[str, Any]) -> List[DecisionNode]:
         """Extract all nodes involved in the decision"""
         nodes = []
@@ -170,13 +212,14 @@ class DecisionVisualizer:
         edges = []
         decision_id = decision_chain['decision_id']
         
-        # Find specific node types
-        trigger_node = next((n for n in nodes if n.node_type == "trigger"), None)
-        evidence_nodes = [n for n in nodes if n.node_type == "evidence"]
-        analysis_nodes = [n for n in nodes if n.node_type == "analysis"]
-        risk_nodes = [n for n in nodes if n.node_type == "risk"]
-        decision_node = next((n for n in nodes if n.node_type == "decision"), None)
-        outcome_node = next((n for n in nodes if n.node_type == "outcome"), None)
+        # Find specific node types in one pass
+        by_type = self._nodes_by_type(nodes)
+        trigger_node = next(iter(by_type.get("trigger", ())), None)
+        evidence_nodes = by_type.get("evidence", [])
+        analysis_nodes = by_type.get("analysis", [])
+        risk_nodes = by_type.get("risk", [])
+        decision_node = next(iter(by_type.get("decision", ())), None)
+        outcome_node = next(iter(by_type.get("outcome", ())), None)
         
         # Trigger → Evidence connections
         if trigger_node:
@@ -191,30 +234,32 @@ class DecisionVisualizer:
                 edges.append(edge)
         
         # Evidence → Analysis connections
-        for evidence_node in evidence_nodes:
-            for analysis_node in analysis_nodes:
-                # Check if evidence influenced this analysis
-                if self._evidence_influenced_analysis(evidence_node, analysis_node, decision_chain):
-                    edge = DecisionEdge(
-                        source=evidence_node.node_id,
-                        target=analysis_node.node_id,
-                        relationship="informed",
-                        strength=min(evidence_node.confidence or 0.5, analysis_node.confidence or 0.5),
-                        description=f"Evidence informed {analysis_node.agent}'s analysis"
-                    )
-                    edges.append(edge)
+        for evidence_node, influenced in zip(evidence_nodes, self._influenced_analyses(evidence_nodes, analysis_nodes)):
+            for analysis_node in influenced:
+                edge = DecisionEdge(
+                    source=evidence_node.node_id,
+                    target=analysis_node.node_id,
+                    relationship="informed",
+                    strength=min(evidence_node.confidence or 0.5, analysis_node.confidence or 0.5),
+                    description=f"Evidence informed {analysis_node.agent}'s analysis"
+                )
+                edges.append(edge)
         
-        # Analysis → Risk connections
+        # Analysis → Risk connections (every pair); each analysis formats its description once
+        risk_targets = [(risk_node.node_id, risk_node.importance) for risk_node in risk_nodes]
         for analysis_node in analysis_nodes:
-            for risk_node in risk_nodes:
-                edge = DecisionEdge(
-                    source=analysis_node.node_id,
-                    target=risk_node.node_id,
+            source = analysis_node.node_id
+            description = f"{analysis_node.agent} identified risk factor"
+            edges.extend(
+                DecisionEdge(
+                    source=source,
+                    target=target,
                     relationship="identified_risk",
-                    strength=risk_node.importance,
-                    description=f"{analysis_node.agent} identified risk factor"
+                    strength=importance,
+                    description=description
                 )
-                edges.append(edge)
+                for target, importance in risk_targets
+            )
         
         # Analysis → Decision connections
         if decision_node:
@@ -236,7 +281,7 @@ class DecisionVisualizer:
                     target=decision_node.node_id,
                     relationship="influenced",
                     strength=risk_node.importance,
-                    description=f"Risk assessment influenced decision"
+                    description="Risk assessment influenced decision"
                 )
                 edges.append(edge)
         
@@ -255,82 +300,80 @@ class DecisionVisualizer:
     
     def _create_network_graph(self, nodes: List[DecisionNode], edges: List[DecisionEdge]) -> Dict[str, Any]:
         """Create network graph visualization data"""
-        # Create NetworkX graph for layout
-        G = nx.DiGraph()
-        
-        # Add nodes
-        for node in nodes:
-            G.add_node(node.node_id, **{
-                'title': node.title,
-                'type': node.node_type,
-                'importance': node.importance
-            })
-        
-        # Add edges
-        for edge in edges:
-            G.add_edge(edge.source, edge.target, weight=edge.strength)
-        
-        # Calculate layout
-        pos = nx.spring_layout(G, k=3, iterations=50)
+        # Layered layout: edges only run trigger → evidence → analysis → risk → decision → outcome,
+        # so each node type gets a column and its nodes are spread evenly around y=0
+        pos = {}
+        for node_type, layer in self._nodes_by_type(nodes).items():
+            x = _LAYER_X.get(node_type, len(_LAYER_X))
+            n = len(layer)
+            for i, node in enumerate(layer):
+                pos[node.node_id] = (x, (i - (n - 1) / 2) / n)
+        
+        # Prepare node data for Plotly; numeric columns go straight into NumPy arrays,
+        # which Plotly serializes without walking Python lists
+        node_count = len(nodes)
+        xs = np.empty(node_count)
+        ys = np.empty(node_count)
+        importances = np.empty(node_count)
+        text = []
+        customdata = []
+        ring_colors = []
+        
+        for i, node in enumerate(nodes):
+            xs[i], ys[i] = pos[node.node_id]
+            importances[i] = node.importance
+            text.append(node.title)
+            # Stored pre-stringified for the hover template
+            customdata.append(str({
+                'description': node.description,
+                'agent': node.agent,
+                'confidence': node.confidence,
+                'timestamp': node.timestamp,
+                'type': node.node_type
+            }))
+            ring_colors.append(_TYPE_COLORS.get(node.node_type, '#888888'))
         
-        # Prepare node data for Plotly
         node_trace_data = {
-            'x': [],
-            'y': [],
-            'text': [],
-            'customdata': [],
+            'x': xs,
+            'y': ys,
+            'text': text,
+            'customdata': customdata,
             'marker': {
-                'size': [],
-                'color': [],
+                'size': np.maximum(20, importances * 50),
+                'color': importances,
                 'colorscale': 'Viridis',
                 'showscale': True,
-                'colorbar': dict(title="Importance")
+                'colorbar': dict(title="Importance"),
+                # Ring color marks the node type; fill stays on the importance scale
+                'line': {'color': ring_colors, 'width': 3}
             }
         }
         
-        # Node type colors
-        type_colors = {
-            'trigger': '#FF6B6B',
-            'evidence': '#4ECDC4',
-            'analysis': '#45B7D1',
-            'risk': '#FFA07A',
-            'decision': '#98D8C8',
-            'outcome': '#F7DC6F'
-        }
-        
-        for node in nodes:
-            x, y = pos[node.node_id]
-            node_trace_data['x'].append(x)
-            node_trace_data['y'].append(y)
-            node_trace_data['text'].append(node.title)
-            node_trace_data['customdata'].append({
-                'description': node.description,
-                'agent': node.agent,
-                'confidence': node.confidence,
-                'timestamp': node.timestamp,
-                'type': node.node_type
-            })
-            node_trace_data['marker']['size'].append(max(20, node.importance * 50))
-            node_trace_data['marker']['color'].append(node.importance)
-        
-        # Prepare edge data for Plotly
-        edge_traces = []
+        # Prepare edge data for Plotly: one trace per strength band instead of one per edge,
+        # each edge's segment separated from the next by None
+        bands = {}
         for edge in edges:
             x0, y0 = pos[edge.source]
             x1, y1 = pos[edge.target]
-            
-            edge_trace = {
-                'x': [x0, x1, None],
-                'y': [y0, y1, None],
+            band = min(_EDGE_BANDS - 1, max(0, int(edge.strength * _EDGE_BANDS)))
+            band_x, band_y = bands.setdefault(band, ([], []))
+            band_x.extend((x0, x1, None))
+            band_y.extend((y0, y1, None))
+        
+        edge_traces = []
+        for band in sorted(bands):
+            band_x, band_y = bands[band]
+            strength = (band + 0.5) / _EDGE_BANDS  # band midpoint
+            edge_traces.append({
+                'x': band_x,
+                'y': band_y,
                 'mode': 'lines',
                 'line': {
-                    'width': max(1, edge.strength * 5),
-                    'color': f'rgba(128, 128, 128, {edge.strength})'
+                    'width': max(1, strength * 5),
+                    'color': f'rgba(128, 128, 128, {strength})'
                 },
-                'hoverinfo': 'text',
-                'text': edge.description
-            }
-            edge_traces.append(edge_trace)
+                'hoverinfo': 'skip'
+            })
         
         return {
             'nodes': node_trace_data,
@@ -342,7 +385,7 @@ class DecisionVisualizer:
                 'margin': dict(b=20,l=5,r=5,t=40),
                 'annotations': [
                     dict(
-                        text="Node size indicates importance, color indicates confidence/relevance",
+                        text="Node size indicates importance, color indicates confidence/relevance, ring indicates node type",
                         showarrow=False,
                         xref="paper", yref="paper",
                         x=0.005, y=-0.002,
@@ -429,16 +472,16 @@ class DecisionVisualizer:
     
     def _create_decision_summary(self, decision_chain: Dict[str, Any]) -> Dict[str, Any]:
         """Create decision summary with key metrics"""
-        agent_analyses = decision_chain.get('agent_analyses', [])
+        agents_involved, avg_confidence = self._analysis_stats(decision_chain.get('agent_analyses', []))
         
         return {
             'decision_id': decision_chain.get('decision_id', ''),
             'priority': decision_chain.get('priority', 'Medium'),
             'status': decision_chain.get('status', 'Unknown'),
-            'agents_involved': list(set(analysis.get('agent_name', '') for analysis in agent_analyses)),
+            'agents_involved': list(agents_involved),
             'evidence_count': len(decision_chain.get('evidence_considered', [])),
             'risk_factors_count': len(decision_chain.get('risk_assessments', [])),
-            'avg_confidence': sum(analysis.get('confidence_level', 0) for analysis in agent_analyses) / len(agent_analyses) if agent_analyses else 0,
+            'avg_confidence': avg_confidence,
             'implementation_status': decision_chain.get('implementation_status', 'Unknown'),
             'follow_up_required': decision_chain.get('follow_up_required', False),
             'created_at': decision_chain.get('created_at', ''),
@@ -447,106 +490,137 @@ class DecisionVisualizer:
         }
     
     # Helper methods
+    def _nodes_by_type(self, nodes: List[DecisionNode]) -> Dict[str, List[DecisionNode]]:
+        """Group nodes by node_type, keeping their order"""
+        by_type = {}
+        for node in nodes:
+            by_type.setdefault(node.node_type, []).append(node)
+        return by_type
+    
+    def _analysis_stats(self, agent_analyses: List[Dict[str, Any]]) -> Tuple[set, float]:
+        """Distinct agents and average confidence of a chain's analyses, in one pass"""
+        agents = set()
+        total_confidence = 0
+        for analysis in agent_analyses:
+            agents.add(analysis.get('agent_name', ''))
+            total_confidence += analysis.get('confidence_level', 0)
+        return agents, total_confidence / len(agent_analyses) if agent_analyses else 0
+    
     def _calculate_risk_importance(self, risk: Dict[str, Any]) -> float:
         """Calculate importance score for risk assessment"""
-        risk_level_scores = {
-            'Low': 0.2,
-            'Medium': 0.5,
-            'High': 0.8,
-            'Critical': 1.0
-        }
-        
-        impact_scores = {
-            'Low': 0.2,
-            'Medium': 0.5,
-            'High': 0.8,
-            'Critical': 1.0
-        }
-        
-        risk_score = risk_level_scores.get(risk.get('risk_level', 'Medium'), 0.5)
-        impact_score = impact_scores.get(risk.get('impact_severity', 'Medium'), 0.5)
+        risk_score = _SEVERITY_SCORES.get(risk.get('risk_level', 'Medium'), 0.5)
+        impact_score = _SEVERITY_SCORES.get(risk.get('impact_severity', 'Medium'), 0.5)
         probability = risk.get('probability', 0.5)
         
         return (risk_score + impact_score + probability) / 3
     
-    def _evidence_influenced_analysis(self, evidence_node: DecisionNode, analysis_node: DecisionNode, decision_chain: Dict[str, Any]) -> bool:
-        """Check if evidence influenced a specific analysis"""
-        # Simple heuristic: evidence influences analysis if they're close in time or related to same agent
-        if evidence_node.agent == analysis_node.agent:
-            return True
-        
-        # Check temporal proximity (within reasonable time window)
-        try:
-            evidence_time = datetime.fromisoformat(evidence_node.timestamp)
-            analysis_time = datetime.fromisoformat(analysis_node.timestamp)
-            time_diff = abs((analysis_time - evidence_time).total_seconds() / 3600)  # hours
-            return time_diff < 24  # Within 24 hours
-        except:
-            return True  # Default to connected if can't determine timing
+    def _parse_ts(self, timestamp: str) -> Optional[datetime]:
+        """Parse an ISO timestamp, or None if it is missing or malformed"""
+        # The same created_at / analysis timestamps recur across edges, timeline and reruns
+        # Empty placeholders are common; skip the raise/catch in fromisoformat for them
+        if not timestamp or not isinstance(timestamp, str):
+            return None
+        return _parse_iso(timestamp)
+    
+    def _influenced_analyses(self, evidence_nodes: List[DecisionNode], analysis_nodes: List[DecisionNode]) -> List[List[DecisionNode]]:
+        """For each evidence node, the analyses it influenced, in analysis order"""
+        # Simple heuristic: evidence influences analysis if they're close in time (within 24 hours)
+        # or related to same agent; undated nodes are assumed connected
+        by_agent = {}
+        for i, analysis_node in enumerate(analysis_nodes):
+            by_agent.setdefault(analysis_node.agent, []).append(i)
+        
+        # Each analysis timestamp is parsed once and sorted, so every evidence node bisects its window
+        dated = []
+        undated = []
+        for i, analysis_node in enumerate(analysis_nodes):
+            analysis_time = self._parse_ts(analysis_node.timestamp)
+            if analysis_time is None:
+                undated.append(i)
+            else:
+                dated.append((analysis_time, i))
+        dated.sort()
+        times = [analysis_time for analysis_time, _ in dated]
+        window = timedelta(hours=24)
+        
+        influenced = []
+        for evidence_node in evidence_nodes:
+            evidence_time = self._parse_ts(evidence_node.timestamp)
+            if evidence_time is None:
+                influenced.append(list(analysis_nodes))
+                continue
+            
+            linked = set(by_agent.get(evidence_node.agent, ()))
+            linked.update(undated)
+            # Strictly within 24 hours either side
+            lo = bisect_right(times, evidence_time - window)
+            hi = bisect_left(times, evidence_time + window)
+            linked.update(i for _, i in dated[lo:hi])
+            influenced.append([analysis_nodes[i] for i in sorted(linked)])
+        
+        return influenced
     
     def _calculate_decision_duration(self, timeline_events: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Calculate decision process duration"""
         if len(timeline_events) < 2:
             return {"total_hours": 0, "phases": []}
         
-        try:
-            start_time = datetime.fromisoformat(timeline_events[0]['date'])
-            end_time = datetime.fromisoformat(timeline_events[-1]['date'])
-            total_hours = (end_time - start_time).total_seconds() / 3600
-            
-            phases = []
-            for i in range(len(timeline_events) - 1):
-                phase_start = datetime.fromisoformat(timeline_events[i]['date'])
-                phase_end = datetime.fromisoformat(timeline_events[i + 1]['date'])
-                phase_duration = (phase_end - phase_start).total_seconds() / 3600
-                
-                phases.append({
-                    'from': timeline_events[i]['event'],
-                    'to': timeline_events[i + 1]['event'],
-                    'duration_hours': phase_duration
-                })
-            
-            return {
-                "total_hours": total_hours,
-                "phases": phases
-            }
-        except:
+        # Parse each event date once; every inner date is both a phase end and the next phase start
+        times = [self._parse_ts(event['date']) for event in timeline_events]
+        if None in times:
             return {"total_hours": 0, "phases": []}
+        
+        total_hours = (times[-1] - times[0]).total_seconds() / 3600
+        
+        phases = []
+        for i in range(len(timeline_events) - 1):
+            phase_duration = (times[i + 1] - times[i]).total_seconds() / 3600
+            
+            phases.append({
+                'from': timeline_events[i]['event'],
+                'to': timeline_events[i + 1]['event'],
+                'duration_hours': phase_duration
+            })
+        
+        return {
+            "total_hours": total_hours,
+            "phases": phases
+        }
     
     def _calculate_confidence_variance(self, confidence_data: List[Dict[str, Any]]) -> float:
         """Calculate variance in confidence levels"""
         if not confidence_data:
             return 0
         
-        confidences = [item['confidence'] for item in confidence_data]
-        mean_confidence = sum(confidences) / len(confidences)
-        variance = sum((c - mean_confidence) ** 2 for c in confidences) / len(confidences)
-        
-        return variance
+        return float(pvariance(item['confidence'] for item in confidence_data))
 
     def create_decision_comparison(self, decision_chains: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Create comparison visualization between multiple decisions"""
-        comparison_data = []
+        # Insights need every record, so this path materializes them; stream with iter_decision_comparison
+        comparison_data = list(self.iter_decision_comparison(decision_chains))
         
+        return {
+            'comparison_data': comparison_data,
+            'insights': self._generate_comparison_insights(comparison_data)
+        }
+    
+    def iter_decision_comparison(self, decision_chains: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield one comparison record per decision chain, so large batches can be streamed"""
         for chain in decision_chains:
-            analyses = chain.get('agent_analyses', [])
+            agents, avg_confidence = self._analysis_stats(chain.get('agent_analyses', []))
+            final_decision = chain.get('final_decision', '')
             
-            comparison_data.append({
+            yield {
                 'decision_id': chain.get('decision_id', ''),
                 'priority': chain.get('priority', 'Medium'),
-                'agents_count': len(set(a.get('agent_name', '') for a in analyses)),
-                'avg_confidence': sum(a.get('confidence_level', 0) for a in analyses) / len(analyses) if analyses else 0,
+                'agents_count': len(agents),
+                'avg_confidence': avg_confidence,
                 'evidence_count': len(chain.get('evidence_considered', [])),
                 'risk_count': len(chain.get('risk_assessments', [])),
                 'implementation_status': chain.get('implementation_status', 'Unknown'),
                 'created_at': chain.get('created_at', ''),
-                'final_decision': chain.get('final_decision', '')[:50] + "..." if len(chain.get('final_decision', '')) > 50 else chain.get('final_decision', '')
-            })
-        
-        return {
-            'comparison_data': comparison_data,
-            'insights': self._generate_comparison_insights(comparison_data)
-        }
+                'final_decision': final_decision[:50] + "..." if len(final_decision) > 50 else final_decision
+            }
     
     def _generate_comparison_insights(self, comparison_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate insights from decision comparison"""
@@ -5,15 +5,12 @@ With recommendations, decision backtracking, and detailed agent time tracking
 """
 
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
-import json
+import orjson
 import glob
 from datetime import datetime
+from itertools import chain
 from journey_analyzer import JourneyAnalyzer
-import networkx as nx
 
 class EnhancedDashboard:
     """Enhanced dashboard with recommendations and decision tracking"""
@@ -120,6 +117,8 @@ class EnhancedDashboard:
     
     def _render_overview(self, data):
         """Enhanced overview with key metrics"""
+        import plotly.express as px
+        
         st.header("📊 Journey Overview")
         
         episodes = data.get('episodes', [])
@@ -259,14 +258,15 @@ class EnhancedDashboard:
         
         for file_path in checkpoint_files:
             try:
-                with open(file_path, 'r') as f:
-                    checkpoint = json.load(f)
+                with open(file_path, 'rb') as f:
+                    checkpoint = orjson.loads(f.read())
                     state = checkpoint['state']
                     
                     # Get all decision chains
-                    active_decisions = state.get('active_decision_chains', [])
-                    completed_decisions = state.get('completed_decision_chains', [])
-                    all_decisions.extend(active_decisions + completed_decisions)
+                    all_decisions.extend(chain(
+                        state.get('active_decision_chains', ()),
+                        state.get('completed_decision_chains', ())
+                    ))
                     
             except Exception as e:
                 st.warning(f"Could not load {file_path}: {e}")
@@ -351,6 +351,8 @@ class EnhancedDashboard:
     
     def _render_agent_time_analysis(self, data):
         """Detailed agent time analysis"""
+        import plotly.express as px
+        
         st.header("⏱️ Agent Time Analysis")
         
         metrics = data.get('internal_metrics', [])
@@ -455,6 +457,8 @@ class EnhancedDashboard:
     
     def _render_detailed_insights(self, data):
         """Detailed insights and correlations"""
+        import plotly.express as px
+        
         st.header("🔬 Detailed Insights")
         
         episodes = data.get('episodes', [])
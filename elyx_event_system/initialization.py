@@ -1,10 +1,13 @@
 # initialization.py
-import json
+import logging
+import orjson
 from typing import Dict, Any
 from langchain_core.messages import SystemMessage, HumanMessage
 from prompts import MEMBER_PROFILE, INIT_MEMBER_SYSTEM
 from state import ConversationalState
-from utils import llm
+from utils import llm, cached_invoke
+
+log = logging.getLogger("elyx.initialization")
 
 def initialize_member_state() -> Dict[str, Any]:
     """
@@ -14,23 +17,23 @@ def initialize_member_state() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: The initial member state
     """
-    print("=== Initializing Member State (Onboarding) ===")
+    log.info("=== Initializing Member State (Onboarding) ===")
     model = llm(temperature=0.4) # Low temperature for deterministic JSON output
 
     # The LLM's task is to convert the unstructured profile into a structured state
-    content = model.invoke([
+    content = cached_invoke(model, [
         SystemMessage(content=INIT_MEMBER_SYSTEM),
         HumanMessage(content=MEMBER_PROFILE)
-    ]).content
+    ])
 
     try:
         # The LLM should return a clean JSON string
-        initial_member_state = json.loads(content)
-        print(f"✅ Successfully parsed initial member state.")
-        print(f"📋 Member profile keys: {list(initial_member_state.keys())}")
+        initial_member_state = orjson.loads(content)
+        log.info("✅ Successfully parsed initial member state.")
+        log.info("📋 Member profile keys: %s", list(initial_member_state.keys()))
         return initial_member_state
-    except json.JSONDecodeError:
-        print(f"❌ ERROR: Failed to parse JSON from LLM output: {content}")
+    except orjson.JSONDecodeError:
+        log.error("❌ ERROR: Failed to parse JSON from LLM output: %s", content)
         # Fallback to a default state if parsing fails
         return {"error": "failed_to_initialize", "name": "Alex Tan", "goals": []}
 
@@ -42,7 +45,7 @@ def create_initial_conversational_state() -> ConversationalState:
     Returns:
         ConversationalState: The initial state ready for the first conversation
     """
-    print("\n=== Creating Initial Conversational State ===")
+    log.info("\n=== Creating Initial Conversational State ===")
     
     # Initialize member state through onboarding
     member_state = initialize_member_state()
@@ -67,8 +70,8 @@ def create_initial_conversational_state() -> ConversationalState:
         "current_decision_context": None
     }
     
-    print("✅ Initial conversational state created successfully")
-    print(f"👤 Member: {member_state.get('name', 'Unknown')}")
-    print(f"🎯 Goals: {len(member_state.get('goals', []))} health goals identified")
+    log.info("✅ Initial conversational state created successfully")
+    log.info("👤 Member: %s", member_state.get('name', 'Unknown'))
+    log.info("🎯 Goals: %d health goals identified", len(member_state.get('goals', [])))
     
     return initial_state
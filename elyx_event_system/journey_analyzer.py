@@ -4,11 +4,10 @@ Member Journey Analysis System
 Extracts episodes, persona changes, and metrics from existing conversation data
 """
 
-import json
+import orjson
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union, BinaryIO
 from dataclasses import dataclass
-import pandas as pd
 import numpy as np
 from state import ConversationalState, ChatMsg, DecisionChain, AgentOutput
 
@@ -99,15 +98,18 @@ class JourneyAnalyzer:
         self.persona_states: List[PersonaState] = []
         self.metrics: List[InternalMetrics] = []
     
-    def analyze_journey(self, checkpoint_files: List[str]) -> Dict[str, Any]:
-        """Main analysis function - processes all checkpoint files"""
+    def analyze_journey(self, checkpoint_files: List[Union[str, BinaryIO]]) -> Dict[str, Any]:
+        """Main analysis function - processes all checkpoint files (paths or binary file-like objects)"""
         all_states = []
         
         # Load all checkpoint data
-        for file_path in checkpoint_files:
-            with open(file_path, 'r') as f:
-                checkpoint = json.load(f)
-                all_states.append(checkpoint['state'])
+        for checkpoint_file in checkpoint_files:
+            if hasattr(checkpoint_file, 'read'):
+                checkpoint = orjson.loads(checkpoint_file.read())
+            else:
+                with open(checkpoint_file, 'rb') as f:
+                    checkpoint = orjson.loads(f.read())
+            all_states.append(checkpoint['state'])
         
         # Extract episodes
         self.episodes = self._extract_episodes(all_states)
@@ -317,9 +319,9 @@ class JourneyAnalyzer:
             else:
                 # Look at recent messages for agent involvement
                 recent_msgs = relevant_messages[-5:] if relevant_messages else []
-                agents_involved = list(set([msg.get('agent', msg.get('role')) 
-                                          for msg in recent_msgs 
-                                          if msg.get('agent') or msg.get('role') != 'member']))
+                agents_involved = list({msg.get('agent', msg.get('role'))
+                                        for msg in recent_msgs
+                                        if msg.get('agent') or msg.get('role') != 'member'})
             
             # Extract recommendations and decision details
             recommendations = self._extract_recommendations_from_event(event)
@@ -494,11 +496,11 @@ class JourneyAnalyzer:
         triggered_by = first_msg.get('agent', first_msg['role'])
         
         # Extract agents involved
-        agents_involved = list(set([
-            msg.get('agent', msg['role']) 
-            for msg in messages 
+        agents_involved = list({
+            msg.get('agent', msg['role'])
+            for msg in messages
             if msg['role'] != 'member'
-        ]))
+        })
         
         # Calculate metrics
         response_time = self._calculate_first_response_time(messages)
@@ -1057,6 +1059,10 @@ class JourneyAnalyzer:
         }
     
     # Conversion methods for output
+    def _message_preview(self, text: str, max_length: int = 100) -> str:
+        """Truncate message text for display in the dashboard"""
+        return text[:max_length] + "..." if len(text) > max_length else text
+    
     def _episode_to_dict(self, episode: Episode) -> Dict[str, Any]:
         """Convert Episode to dictionary"""
         return {
@@ -1069,7 +1075,7 @@ class JourneyAnalyzer:
             "trigger_type": episode.trigger_type,
             "trigger_description": episode.trigger_description,
             "triggered_by": episode.triggered_by,
-            "messages": episode.messages,  # Include messages
+            "messages": [{**msg, "preview": self._message_preview(msg['text'])} for msg in episode.messages],
             "agents_involved": episode.agents_involved,
             "message_count": episode.message_count,
             "final_outcome": episode.final_outcome,
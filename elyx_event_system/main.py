@@ -2,9 +2,9 @@
 import json
 import os
 import sys
+import logging
 import argparse
 from orchestrator import build_graph
-from state import ConversationalState
 from initialization import create_initial_conversational_state
 
 import random
@@ -77,7 +77,8 @@ def save_checkpoint(state, week_number, checkpoint_dir):
     checkpoint_data = {
         "week_number": week_number,
         "timestamp": datetime.now().isoformat(),
-        "state": state
+        # recent_chat and decision_index are derived from the saved lists; they are rebuilt on resume
+        "state": {key: value for key, value in state.items() if key not in ("recent_chat", "decision_index")}
     }
     
     try:
@@ -184,6 +185,12 @@ def main():
     # Parse command line arguments
     args = parse_arguments()
     
+    # Agents, the orchestrator and onboarding log under "elyx"; keep them on the console as before
+    # (configured on "elyx" only, so httpx request logs stay quiet)
+    elyx_log = logging.getLogger("elyx")
+    elyx_log.setLevel(logging.INFO)
+    elyx_log.addHandler(logging.StreamHandler(sys.stdout))
+    
     # Initialize the conversation graph
     graph = build_graph()
     
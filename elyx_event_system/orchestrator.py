@@ -1,15 +1,16 @@
 # orchestrator.py
-import json
-from typing import Dict, Any
+import logging
 from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import SystemMessage, HumanMessage
-from pprint import pprint
 from state import ConversationalState
-from utils import llm, append_message, append_agent_response, create_decision_chain, add_agent_analysis, finalize_decision
-from agents import AGENT_KEYS, AGENT_NODE_MAP, AGENT_FUNC_MAP
+from utils import llm, cached_invoke, create_decision_chain, add_agent_analysis, finalize_decision, recent_chat, prompt_json
+from decision_traceback import decision_index
+from agents import AGENT_KEYS, AGENT_NODE_MAP, AGENT_REGISTRY
 from agents.member import member_node
 from prompts import DECISION_SYSTEM_PROMPT
 
+log = logging.getLogger("elyx.orchestrator")
+
 # -------- Diagnostic Scheduling Function ----------
 def should_schedule_diagnostic(state: ConversationalState) -> bool:
     """
@@ -44,7 +45,7 @@ def create_diagnostic_event(state: ConversationalState) -> str:
     if 'simulation_counters' in state.get('member_state', {}):
         state['member_state']['simulation_counters']['weeks_since_last_diagnostic'] = 0
     
-    print(f"  -> Created diagnostic event: {event_id}")
+    log.info("  -> Created diagnostic event: %s", event_id)
     return event_id
 
 # -------- Quarterly Test Panel Check Function ----------
@@ -101,17 +102,17 @@ def decide_next_node(state: ConversationalState) -> str:
     Uses LLM to analyze the current conversation state and decide which agent
     should respond next, if the member should speak next, or if the conversation should end.
     """
-    print("--- Running Node: Decider ---")
+    log.info("--- Running Node: Decider ---")
     
     # First, check for the member's explicit decision to end the turn.
     if state.get("member_decision") == "END_TURN":
-        print("  -> Member ended their turn. Ending conversation loop.")
+        log.info("  -> Member ended their turn. Ending conversation loop.")
         return "END"  # Return "END" to match the conditional edges
 
     # --- DIAGNOSTIC SCHEDULING CHECK ---
     # Check if diagnostics are due and schedule them automatically
     if should_schedule_diagnostic(state):
-        print("  -> Diagnostics due - scheduling comprehensive health assessment")
+        log.info("  -> Diagnostics due - scheduling comprehensive health assessment")
         create_diagnostic_event(state)
         # Route to TestPanel to conduct the diagnostic testing
         return "TestPanelNode"
@@ -131,7 +132,7 @@ def decide_next_node(state: ConversationalState) -> str:
                 member_id = state.get("member_state", {}).get("name", "Unknown")
                 triggering_event = f"{agent_name} made recommendations/decisions"
                 decision_id = create_decision_chain(state, triggering_event, member_id)
-                print(f"  -> Created new decision chain: {decision_id}")
+                log.info("  -> Created new decision chain: %s", decision_id)
             
             # Add the agent's analysis to the current decision chain
             if active_chains:
@@ -167,9 +168,9 @@ def decide_next_node(state: ConversationalState) -> str:
                         last_response.get("recommendations", []),
                         last_response.get("medications", []) + last_response.get("tests", [])
                     )
-                    print(f"  -> Added {agent_name}'s analysis to decision chain")
+                    log.info("  -> Added %s's analysis to decision chain", agent_name)
                 else:
-                    print(f"  -> {agent_name}'s analysis already added to current decision chain")
+                    log.info("  -> %s's analysis already added to current decision chain", agent_name)
 
     # --- CONTEXT DISTILLATION ---
     # Extract only the necessary information from the full state.
@@ -183,7 +184,7 @@ def decide_next_node(state: ConversationalState) -> str:
     # Create a concise summary of the recent conversation.
     chat_summary = [
         f"{msg.get('agent') or msg.get('role', 'unknown')}: {msg.get('text', '')}"
-        for msg in chat_history[-10:] # Last 5 messages are enough for context
+        for msg in recent_chat(state, 10) # Last 5 messages are enough for context
     ]
 
     # Get the last agent's structured output, which is critical for handoffs.
@@ -205,17 +206,17 @@ def decide_next_node(state: ConversationalState) -> str:
         "member_summary": member_summary,
         "available_agents": AGENT_KEYS
     }
-    human_prompt_content = json.dumps(relevant_context, indent=2)
+    human_prompt_content = prompt_json(relevant_context)
 
     model = llm(temperature=0.4) 
     
     try:
-        decision = model.invoke([
+        decision = cached_invoke(model, [
             SystemMessage(content=DECISION_SYSTEM_PROMPT),
             HumanMessage(content=human_prompt_content)
-        ]).content.strip().replace("\"", "")
+        ]).strip().replace("\"", "")
         
-        print(f"  -> Decider chose: {decision}")
+        log.info("  -> Decider chose: %s", decision)
         
         # Validate the decision
         if decision == "END":
@@ -224,28 +225,31 @@ def decide_next_node(state: ConversationalState) -> str:
             if active_chains:
                 for chain in active_chains:
                     finalize_decision(state, chain["decision_id"], "Conversation ended", "Conversation ended")
-                print("  -> Finalized active decision chains")
+                log.info("  -> Finalized active decision chains")
             return "END"  # Return "END" to match the conditional edges
         elif decision == "Member":
             return "Member"
-        elif decision in AGENT_KEYS:
-            return AGENT_NODE_MAP[decision]
-        else:
-            print(f"  -> Invalid decision '{decision}', defaulting to Member.")
+        
+        # One hash lookup both validates the agent key and resolves its node
+        node_name = AGENT_NODE_MAP.get(decision)
+        if node_name is None:
+            log.warning("  -> Invalid decision '%s', defaulting to Member.", decision)
             return "Member"
+        return node_name
             
     except Exception as e:
-        print(f"  -> Error in decider: {e}, defaulting to Member.")
+        log.error("  -> Error in decider: %s, defaulting to Member.", e)
         return "Member"
 
 
-# -------- Decider Node: Just passes through the state ----------
+# -------- Decider Node: Keeps the decision index in the graph state ----------
 def decider_node(state: ConversationalState) -> ConversationalState:
     """
-    This node just passes through the state. The actual decision logic
-    is handled by the conditional edge function.
+    Brings the decision index up to date and writes it to the state. The actual
+    decision logic is handled by the conditional edge function, which cannot
+    write state itself; it updates this index in place.
     """
-    return {}
+    return {"decision_index": decision_index(state)}
 
 
 # -------- Agent Response Collector Node ----------
@@ -271,8 +275,8 @@ def end_conversation_node(state: ConversationalState) -> ConversationalState:
     """
     Handles the end of the conversation turn.
     """
-    print("--- Running Node: end_conversation_node ---")
-    print("  -> Conversation turn ended")
+    log.info("--- Running Node: end_conversation_node ---")
+    log.info("  -> Conversation turn ended")
     state['new_thread_required'] = True
     if 'simulation_counters' in state['member_state']:
         state['member_state']['simulation_counters']['weeks_since_last_trip'] += 1
@@ -289,7 +293,7 @@ def end_conversation_node(state: ConversationalState) -> ConversationalState:
                 "Decision chain completed with conversation",
                 "System"
             )
-        print(f"  -> Finalized {len(active_chains)} active decision chains")
+        log.info("  -> Finalized %d active decision chains", len(active_chains))
     
     return state
 
@@ -304,8 +308,8 @@ def build_graph():
     g.add_node("EndConversation", end_conversation_node)
 
     # Agent nodes
-    for agent_key, func in AGENT_FUNC_MAP.items():
-        g.add_node(AGENT_NODE_MAP[agent_key], func)
+    for _, node_name, func in AGENT_REGISTRY:
+        g.add_node(node_name, func)
 
     # Main flow: Start → Member → Decider (removed InitMember)
     g.add_edge(START, "Member")
@@ -0,0 +1,53 @@
+# schemas.py
+import logging
+from typing import Dict, Any, Optional, Type
+from pydantic import BaseModel, ConfigDict
+from pydantic_core import from_json
+
+log = logging.getLogger("elyx.agents")
+
+FALLBACK_MESSAGE = "I apologize, but I couldn't generate a proper response."
+
+class AgentPayload(BaseModel):
+    """Structured reply every specialist agent is asked to return"""
+    # Agents may add decision fields (recommendations, confidence, ...) that the orchestrator reads
+    model_config = ConfigDict(extra="allow")
+
+    agent: Optional[Any] = None
+    message: Optional[Any] = None
+    proposed_event: Optional[Any] = None
+
+class RoutingPayload(AgentPayload):
+    """Agent reply that can hand the conversation to an expert (Ruby)"""
+    needs_expert: Any = "false"
+    expert_needed: Optional[Any] = None
+    routing_reason: Any = ""
+
+class TestPanelPayload(RoutingPayload):
+    """TestPanel reply with its diagnostic assessment"""
+    analysis: Any = "Comprehensive health assessment completed"
+    # Optional: an otherwise valid reply with "medications": null must not lose its test results
+    recommendations: Optional[Any] = []
+    medications: Optional[Any] = []
+    tests: Optional[Any] = []
+    confidence: Any = 0.9
+
+def parse_agent_payload(content: Any, agent: str, schema: Type[AgentPayload] = AgentPayload) -> Dict[str, Any]:
+    """
+    Validate an agent's LLM output against its schema in one pass.
+    Missing fields take the schema defaults; output that is not a JSON object
+    becomes a default payload carrying the raw text as the message.
+    """
+    try:
+        payload = schema.model_validate(from_json(content, allow_partial='trailing-strings')).model_dump()
+    except (ValueError, TypeError) as e:
+        # ValidationError and JSON decode errors are ValueErrors; TypeError covers non-string content
+        log.warning("  -> %s reply is not a valid payload (%s), using raw text.", agent, type(e).__name__)
+        # Defaults are already valid, so skip re-validating them
+        payload = schema.model_construct(agent=agent, message=content).model_dump()
+
+    if payload["agent"] is None:
+        payload["agent"] = agent
+    if payload["message"] is None:
+        payload["message"] = content
+    return payload
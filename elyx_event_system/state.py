@@ -1,8 +1,5 @@
 # state.py
-from typing import TypedDict, List, Dict, Any, Optional, Annotated
-import operator
-from pprint import pprint
-from datetime import datetime
+from typing import TypedDict, List, Dict, Any, Optional, Deque
 
 class ChatMsg(TypedDict):
     role: str       # "member" | "ruby" | "dr_warren" | ... 
@@ -121,6 +118,7 @@ class ConversationalState(TypedDict):
     # Inputs
     message: str                           # current (simulated) member message or synthesized snippet
     chat_history: List[ChatMsg]         # full running conversation log
+    recent_chat: Deque[ChatMsg]         # bounded window over the tail of chat_history
     member_state: Dict[str, Any]           # evolving facts (adherence, travel, labs...)
     week_index: int                        # current week (1-35)
     thread_index: int                      # current conversation thread within the week (1-5)
@@ -144,4 +142,6 @@ class ConversationalState(TypedDict):
     # Decision Tracking System
     active_decision_chains: List[DecisionChain]  # Current decisions being processed
     completed_decision_chains: List[DecisionChain]  # Historical decisions for reference
-    current_decision_context: Optional[DecisionChain]  # The decision being worked on in current turn
\ No newline at end of file
+    current_decision_context: Optional[DecisionChain]  # The decision being worked on in current turn
+    decision_index: Dict[str, Any]  # lookup tables over the decision chains, rebuilt on resume
+    last_test_panel: Optional[Dict[str, Any]]  # week_index, input key and payload of the last diagnostic panel
\ No newline at end of file
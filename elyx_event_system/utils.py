@@ -1,18 +1,65 @@
 import os
+import hashlib
+import orjson
 import uuid
 import random
+import httpx
+from collections import deque
+from functools import lru_cache
 from typing import Dict, Any
 from langchain_groq import ChatGroq
+from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
 from state import ConversationalState, ChatMsg, AgentOutput, EventObj
+from decision_traceback import decision_index, add_active_decision_chain, add_chain_analysis
 from typing import List
 from datetime import datetime, timedelta
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 groq_api_key = os.getenv("GROQ_API_KEY")
 
-def llm(model: str = "llama3-70b-8192", temperature: float = 0.5) -> ChatGroq:
-    return ChatGroq(model=model, temperature=temperature, api_key=groq_api_key)
+@lru_cache(maxsize=1)
+def _http_client() -> httpx.Client:
+    """One connection pool shared by every chat client, whatever its temperature"""
+    return httpx.Client()
+
+@lru_cache(maxsize=16)
+def llm(model: str = "llama3-70b-8192", temperature: float = 0.5, json_mode: bool = False) -> ChatGroq:
+    """Shared chat client per (model, temperature, json_mode), so every turn reuses one HTTP session"""
+    # JSON mode makes Groq return a syntactically valid JSON object (the prompt must ask for JSON)
+    model_kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+    return ChatGroq(model=model, temperature=temperature, api_key=groq_api_key, http_client=_http_client(),
+                    model_kwargs=model_kwargs)
+
+# -------- Exact-match LLM response cache ----------
+# Opt-in: even low-temperature Groq sampling is not deterministic, so replaying a
+# cached reply is only right for re-runs that should reproduce the same output.
+LLM_CACHE_ENABLED = os.getenv("ELYX_LLM_CACHE", "off").lower() in ("1", "on", "true")
+LLM_CACHE_DIR = os.getenv("ELYX_LLM_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".llm_cache"))
+
+def cached_invoke(model: ChatGroq, messages: List[Any]) -> str:
+    """Invoke the model, reusing a stored reply for an identical (model, temperature, model_kwargs, messages) prompt"""
+    if not LLM_CACHE_ENABLED:
+        return model.invoke(messages).content
+    
+    key = hashlib.sha256(orjson.dumps({
+        "model": model.model_name,
+        "temperature": model.temperature,
+        # e.g. JSON mode changes what the model may return for the same prompt
+        "model_kwargs": model.model_kwargs,
+        "messages": [[m.type, m.content] for m in messages]
+    }, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    path = os.path.join(LLM_CACHE_DIR, f"{key}.json")
+    
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())["content"]
+    
+    content = model.invoke(messages).content
+    os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(orjson.dumps({"content": content}))
+    return content
 
 def calculate_conversation_timestamp(week_index: int, thread_index: int, message_in_thread: int) -> datetime:
     """
@@ -53,7 +100,71 @@ def calculate_conversation_timestamp(week_index: int, thread_index: int, message
     
     return timestamp
 
-def append_message(state: ConversationalState, role: str, agent: str, text: str, meta: Dict[str, Any] | None = None, event_id: str | None = None):
+# Number of trailing chat messages kept in state["recent_chat"] for agent prompts
+RECENT_CHAT_WINDOW = 20
+# Rough token budget for the chat history included in a single prompt
+RECENT_CHAT_TOKEN_BUDGET = 800
+
+def _recent_chat_window(state: ConversationalState) -> deque:
+    """Bounded window over the chat tail, rebuilt once if missing (e.g. after resuming from a checkpoint)"""
+    window = state.get("recent_chat")
+    if not isinstance(window, deque):
+        window = deque(state.get("chat_history", [])[-RECENT_CHAT_WINDOW:], maxlen=RECENT_CHAT_WINDOW)
+        state["recent_chat"] = window
+    return window
+
+def select_recent(messages: List[ChatMsg], budget_tokens: int = RECENT_CHAT_TOKEN_BUDGET) -> List[ChatMsg]:
+    """Newest messages whose text fits a rough token budget (~4 characters per token), oldest first"""
+    selected = []
+    used_tokens = 0
+    for msg in reversed(messages):
+        msg_tokens = len(msg.get("text", "")) // 4 + 1
+        # Always keep the newest message, even if it alone exceeds the budget
+        if selected and used_tokens + msg_tokens > budget_tokens:
+            break
+        selected.append(msg)
+        used_tokens += msg_tokens
+    selected.reverse()
+    return selected
+
+def recent_chat(state: ConversationalState, count: int = RECENT_CHAT_WINDOW,
+                budget_tokens: int = RECENT_CHAT_TOKEN_BUDGET) -> List[ChatMsg]:
+    """Up to `count` of the latest chat messages, read from the bounded window and trimmed to a token budget"""
+    return select_recent(list(_recent_chat_window(state))[-count:], budget_tokens)
+
+def prompt_json(data: Any) -> str:
+    """Compact, key-sorted JSON for LLM prompts; identical data always yields an identical prompt"""
+    return orjson.dumps(data, option=orjson.OPT_SORT_KEYS).decode()
+
+def member_profile_message(state: ConversationalState) -> HumanMessage:
+    """
+    Stable prompt block holding the member state, sent right after the system prompt.
+    Keys are sorted so an unchanged member state serializes to the same prefix every turn;
+    the per-turn message and chat history go in a separate message after it.
+    """
+    profile = {"member_state": state.get("member_state", {})}
+    return HumanMessage(content=prompt_json(profile))
+
+# Console timestamp format; a turn's log line usually repeats the previous message's timestamp
+DISPLAY_TIME_FORMAT = "%a, %b %d, %I:%M %p"
+_last_display_timestamp = None
+_last_display_time = None
+
+def _cache_display_time(timestamp_str: str, timestamp: datetime):
+    """Pre-format a new message's console time while its datetime is still at hand"""
+    global _last_display_timestamp, _last_display_time
+    _last_display_timestamp = timestamp_str
+    _last_display_time = timestamp.strftime(DISPLAY_TIME_FORMAT)
+
+def format_display_time(timestamp: str) -> str:
+    """Format an ISO timestamp for console output, reusing the last result for a repeated timestamp"""
+    global _last_display_timestamp, _last_display_time
+    if timestamp != _last_display_timestamp:
+        _last_display_time = datetime.fromisoformat(timestamp).strftime(DISPLAY_TIME_FORMAT)
+        _last_display_timestamp = timestamp
+    return _last_display_time
+
+def append_message(state: ConversationalState, role: str, agent: str, text: str, meta: Dict[str, Any] | None = None, event_id: str | None = None) -> ChatMsg:
     # Get week and thread information from state
     week_index = state.get("week_index", 1)
     thread_index = state.get("thread_index", 1)
@@ -84,6 +195,8 @@ def append_message(state: ConversationalState, role: str, agent: str, text: str,
     
     # Convert datetime to ISO format string for JSON serialization
     timestamp_str = timestamp.isoformat()
+    # The node logging this message formats the same timestamp next; skip the ISO re-parse
+    _cache_display_time(timestamp_str, timestamp)
     
     msg = ChatMsg(
         role=role, 
@@ -95,11 +208,15 @@ def append_message(state: ConversationalState, role: str, agent: str, text: str,
         meta=meta or {}
     )
     
+    recent = _recent_chat_window(state)
     history.append(msg)
     state["chat_history"] = history
+    recent.append(msg)
     
     # Increment message counter for this thread
     state["message_in_thread"] = message_in_thread + 1
+    
+    return msg
 
 def generate_event_id(week_index: int, thread_index: int, event_type: str = "event") -> str:
     """Generate a unique event ID with semantic meaning"""
@@ -164,6 +281,12 @@ def append_agent_response(state: ConversationalState, payload: Dict[str, Any]):
     responses.append(AgentOutput(**payload))
     state["agent_responses"] = responses
 
+def record_agent_turn(state: ConversationalState, payload: Dict[str, Any], role: str, agent: str) -> ChatMsg:
+    """Log an agent's structured reply and its chat message in one write"""
+    append_agent_response(state, payload)
+    return append_message(state, role=role, agent=agent, text=payload.get("message", ""),
+                          meta={"source": "agent", "week_index": state.get("week_index", 0)})
+
 # Decision Tracking System Utility Functions
 def create_decision_chain(state: ConversationalState, triggering_event: str, member_id: str, 
                          priority: str = "Medium") -> str:
@@ -197,9 +320,7 @@ def create_decision_chain(state: ConversationalState, triggering_event: str, mem
         "tags": []
     }
     
-    active_chains = state.get("active_decision_chains", [])
-    active_chains.append(decision_chain)
-    state["active_decision_chains"] = active_chains
+    add_active_decision_chain(state, decision_chain)
     
     # Set as current decision context
     state["current_decision_context"] = decision_chain
@@ -226,7 +347,7 @@ def add_agent_analysis(state: ConversationalState, decision_id: str, agent_name:
                 "timestamp": datetime.now().isoformat()
             }
             
-            chain["agent_analyses"].append(analysis)
+            add_chain_analysis(state, chain, analysis)
             chain["updated_at"] = datetime.now().isoformat()
             
             # Update current decision context if this is the active one
@@ -360,19 +481,7 @@ def track_outcome(state: ConversationalState, decision_id: str, outcome_metrics:
 
 def get_decision_chain(state: ConversationalState, decision_id: str):
     """Get a specific decision chain by ID"""
-    # Check active chains first
-    active_chains = state.get("active_decision_chains", [])
-    for chain in active_chains:
-        if chain["decision_id"] == decision_id:
-            return chain
-    
-    # Check completed chains
-    completed_chains = state.get("completed_decision_chains", [])
-    for chain in completed_chains:
-        if chain["decision_id"] == decision_id:
-            return chain
-    
-    return None
+    return decision_index(state)["by_id"].get(decision_id)
 
 def get_active_decision_chains(state: ConversationalState):
     """Get all active decision chains"""